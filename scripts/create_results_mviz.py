@@ -6,32 +6,122 @@ Generates two leaderboards from results/run_summaries.csv:
 - Classic (multi-turn): docs/classic.md -> docs/classic.html
 """
 
+import importlib.util
 import json
-import subprocess
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import os
+import re
+
+
+# pyarrow parses CSVs multithreaded; it ships with most pandas installs but
+# isn't a hard dependency, so fall back to the default C parser without it.
+# find_spec checks availability without paying pyarrow's import cost here.
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+CSV_ENGINE = "pyarrow" if HAVE_PYARROW else "c"
+
+# Columns the leaderboards actually read, with explicit dtypes so read_csv
+# skips type inference and never materializes the rest of the summary CSV.
+# Integer counts are COALESCEd to 0 by extract_summaries.py; everything that
+# can be NULL stays float so missing values survive as NaN.
+CSV_DTYPES = {
+    "run_id": "string",
+    "model": "string",
+    "mode": "string",
+    "start_timestamp": "object",
+    "puzzles_attempted": "int64",
+    "puzzles_solved": "int64",
+    "solve_rate": "float64",
+    "total_guesses": "int64",
+    "correct_guesses": "int64",
+    "invalid_responses": "int64",
+    "guess_accuracy": "float64",
+    "total_score": "float64",
+    "total_trap_bonus": "float64",
+    "max_score": "float64",
+    "trap_scored": "float64",
+    "avg_time_sec": "float64",
+    "avg_inference_sec": "float64",
+    "total_tokens": "int64",
+    "total_cost": "float64",
+    "total_upstream_cost": "float64",
+}
+
+
+# Cross-page link shown in each leaderboard's intro line, as (label, href).
+NAV_LINKS = {
+    "oneshot": ("Classic (multi-turn) leaderboard →", "classic.html"),
+    "classic": ("← One-shot leaderboard", "index.html"),
+}
+
+
+def _cache_paths(csv_file: str, mode: str) -> tuple[Path, Path]:
+    cache_file = Path(csv_file).with_name(f".latest_runs_{mode}.parquet")
+    return cache_file, cache_file.with_name(f"{cache_file.name}.key")
+
+
+def _cache_key(csv_file: str, mode: str) -> str:
+    # Keyed on file metadata rather than a content hash so a warm run never
+    # reads the CSV at all. This script's own mtime is included so a change
+    # to the filtering logic invalidates the cache too.
+    csv_stat = os.stat(csv_file)
+    script_stat = os.stat(__file__)
+    return f"{csv_stat.st_mtime_ns}:{csv_stat.st_size}:{mode}:{script_stat.st_mtime_ns}"
+
+
+def read_cached_data(csv_file: str, mode: str) -> pd.DataFrame | None:
+    """Return the filtered frame cached for this CSV and mode, if still valid.
+
+    The cache is Parquet next to the CSV and needs pyarrow; without it, or
+    when the CSV has changed since the cache was written, returns None.
+    """
+    if not HAVE_PYARROW:
+        return None
+    cache_file, key_file = _cache_paths(csv_file, mode)
+    if (
+        cache_file.exists()
+        and key_file.exists()
+        and key_file.read_text(encoding="utf-8").strip() == _cache_key(csv_file, mode)
+    ):
+        return pd.read_parquet(cache_file, engine="pyarrow")
+    return None
+
+
+def write_cached_data(df: pd.DataFrame, csv_file: str, mode: str) -> None:
+    """Cache a frame from load_and_filter_data for read_cached_data."""
+    if not HAVE_PYARROW:
+        return
+    cache_file, key_file = _cache_paths(csv_file, mode)
+    df.to_parquet(cache_file, engine="pyarrow", compression="zstd")
+    key_file.write_text(_cache_key(csv_file, mode) + "\n", encoding="utf-8")
 
 
 def load_and_filter_data(
     csv_file: str = "results/run_summaries.csv", mode: str = "oneshot"
 ) -> pd.DataFrame:
     """Load CSV data and apply filtering logic for one eval mode."""
-    df = pd.read_csv(csv_file)
+    # The pyarrow engine only takes usecols as a list of existing names, so
+    # read the header first; older CSVs may lack some optional columns.
+    header = pd.read_csv(csv_file, nrows=0).columns
+    df = pd.read_csv(
+        csv_file,
+        engine=CSV_ENGINE,
+        usecols=[col for col in header if col in CSV_DTYPES],
+        dtype={col: dtype for col, dtype in CSV_DTYPES.items() if col in header},
+    )
 
     # Backfill columns added in later versions so older CSVs still render.
     # Missing values stay NaN so downstream can show "—" for "not measured".
     for col in (
         "avg_inference_sec",
-        "total_inference_sec",
-        "total_backoff_sec",
         "total_score",
         "total_trap_bonus",
         "max_score",
-        "avg_score",
         "trap_scored",
     ):
         if col not in df.columns:
-            df[col] = pd.NA
+            df[col] = np.nan
 
     # Pre-4.0 CSVs have no mode column; every run back then was classic.
     if "mode" not in df.columns:
@@ -56,22 +146,27 @@ def load_and_filter_data(
         return filtered_df
 
     # Combined eval cost
-    filtered_df.loc[:, "eval_cost"] = filtered_df["total_cost"] + filtered_df[
-        "total_upstream_cost"
-    ].fillna(0)
+    filtered_df["eval_cost"] = (
+        filtered_df["total_cost"].to_numpy()
+        + filtered_df["total_upstream_cost"].fillna(0).to_numpy()
+    )
 
     # Latest run per model. MotherDuck emits offsets like "+00:00" for some rows
     # and plain ISO for others; without utc=True the resulting Series mixes
-    # tz-aware and tz-naive Timestamps, and idxmax() can't compare them.
-    filtered_df.loc[:, "start_timestamp"] = pd.to_datetime(
+    # tz-aware and tz-naive Timestamps, and the sort can't compare them.
+    # A stable descending sort keeps the first row on timestamp ties, matching
+    # what idxmax() picked. Assigning the whole column makes it datetime64
+    # (rather than object-dtype Timestamps), so build_table_data can use .dt
+    # without parsing again.
+    filtered_df["start_timestamp"] = pd.to_datetime(
         filtered_df["start_timestamp"], format="ISO8601", utc=True
     )
-    latest_runs = filtered_df.loc[
-        filtered_df.groupby("model")["start_timestamp"].idxmax()
-    ].copy()
+    latest_runs = filtered_df.sort_values(
+        "start_timestamp", ascending=False, kind="stable"
+    ).drop_duplicates(subset="model", keep="first")
 
-    latest_runs.loc[:, "eval_cost_per_game"] = (
-        latest_runs["eval_cost"] / latest_runs["puzzles_attempted"]
+    latest_runs["eval_cost_per_game"] = (
+        latest_runs["eval_cost"].to_numpy() / latest_runs["puzzles_attempted"].to_numpy()
     )
 
     # Sort by inference time (fair across upstream-throttled models) with wall
@@ -81,7 +176,7 @@ def load_and_filter_data(
     )
     if mode == "oneshot":
         # Headline metric is total score (max 5 per puzzle = 100 on canonical).
-        latest_runs.loc[:, "total_score"] = latest_runs["total_score"].fillna(0)
+        latest_runs["total_score"] = latest_runs["total_score"].fillna(0)
         sort_keys = ["total_score", "_sort_time", "eval_cost_per_game"]
     else:
         sort_keys = ["solve_rate", "_sort_time", "eval_cost_per_game"]
@@ -95,103 +190,120 @@ def load_and_filter_data(
 
 
 
-def format_percentage(rate):
-    if rate >= 1.0:
-        return "1.000"
-    return f".{int(rate * 1000):03d}"
+def int_strings(values: pd.Series) -> np.ndarray:
+    """Stringify an integer column in one NumPy call."""
+    return values.to_numpy(dtype=np.int64).astype(str)
 
 
-def format_time(seconds):
-    if pd.isna(seconds) or seconds is None:
-        return "0s"
-    try:
-        seconds = float(seconds)
-        if seconds < 0:
-            seconds = 0
-    except (ValueError, TypeError):
-        return "0s"
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    if minutes > 0:
-        return f"{minutes}m{secs}s"
-    return f"{secs}s"
+def format_time(seconds: pd.Series) -> np.ndarray:
+    """Format a column of seconds as "1m5s" / "42s"; missing or negative reads "0s"."""
+    secs = pd.to_numeric(seconds, errors="coerce").to_numpy(dtype=float)
+    secs = np.nan_to_num(secs, nan=0.0).clip(min=0).astype(np.int64)
+    minutes, secs = np.divmod(secs, 60)
+    secs_str = np.char.add(secs.astype(str), "s")
+    return np.where(
+        minutes > 0, np.char.add(np.char.add(minutes.astype(str), "m"), secs_str), secs_str
+    )
 
 
-def format_tokens(tokens):
-    return f"{tokens / 1000:.1f}k"
+def format_tokens(tokens: np.ndarray) -> np.ndarray:
+    return np.char.mod("%.1fk", tokens / 1000)
 
 
 def build_table_data(df: pd.DataFrame, mode: str = "oneshot") -> list[dict[str, str]]:
     """Build the data rows for the mviz table."""
-    avg_tokens = df["total_tokens"] / df["puzzles_attempted"]
-    avg_cost = df["eval_cost"] / df["puzzles_attempted"]
-
-    rows = []
-    for _, row in df.iterrows():
-        run_id = row.get("run_id", "")
-        model_name = row["model"]
-        if run_id:
-            model_cell = f'<a href="logs/{run_id}.html">{model_name}</a>'
-        else:
-            model_cell = model_name
-
-        date = row["start_timestamp"].strftime("%Y-%m-%d")
-        idx = row.name
-        avg_tok = avg_tokens[idx]
-        avg_c = avg_cost[idx]
-
-        # Inference time when we measured it (wall minus retry backoff),
-        # falling back to wall time for historical runs we didn't instrument.
-        avg_inference = row.get("avg_inference_sec")
-        if avg_inference is None or pd.isna(avg_inference):
-            avg_time_display = format_time(row["avg_time_sec"])
-        else:
-            avg_time_display = format_time(avg_inference)
+    # Pulled out once and reused for every column that needs it.
+    attempted = df["puzzles_attempted"].to_numpy(dtype=np.int64)
+    # Per-game cost is already computed by load_and_filter_data; only tokens
+    # need dividing, done on raw arrays to skip index alignment.
+    avg_tokens = df["total_tokens"].to_numpy(dtype=float) / attempted
+    avg_cost = df["eval_cost_per_game"].to_numpy(dtype=float)
+
+    model = df["model"].astype(str)
+    run_id = df["run_id"] if "run_id" in df.columns else pd.Series(pd.NA, index=df.index)
+    has_run = run_id.notna() & (run_id.astype(str) != "")
+    model_cell = ('<a href="logs/' + run_id.astype(str) + '.html">' + model + "</a>").where(
+        has_run, model
+    )
+
+    date = df["start_timestamp"].dt.strftime("%Y-%m-%d")
 
-        common_tail = {
-            "avg_time": avg_time_display,
-            "tok_per_game": format_tokens(avg_tok),
-            "cost": round(float(row["eval_cost"]), 2),
-            "cost_per_game": f"${avg_c:.3f}",
+    # Inference time when we measured it (wall minus retry backoff),
+    # falling back to wall time for historical runs we didn't instrument.
+    avg_time = df["avg_inference_sec"].where(df["avg_inference_sec"].notna(), df["avg_time_sec"])
+
+    common_tail = {
+        "avg_time": format_time(avg_time),
+        "tok_per_game": format_tokens(avg_tokens),
+        "cost": df["eval_cost"].astype(float).round(2),
+        "cost_per_game": np.char.mod("$%.3f", avg_cost),
+    }
+
+    if mode == "oneshot":
+        # correct_guesses = groups matched; 4 groups possible per puzzle.
+        total_score = df["total_score"].astype(float)
+        max_score = df["max_score"].to_numpy(dtype=float)
+        max_score = pd.Series(
+            np.where(np.isnan(max_score), 5 * attempted, max_score).astype(np.int64),
+            index=df.index,
+        )
+        trap_bonus = df["total_trap_bonus"]
+        columns = {
+            "model": model_cell,
+            "date": date,
+            "pts": total_score.astype(int),
+            "pts_pct": (total_score / max_score.where(max_score != 0)).round(4).fillna(0.0),
+            "w": int_strings(df["puzzles_solved"]),
+            "grp": np.char.add(
+                np.char.add(int_strings(df["correct_guesses"]), "/"), (4 * attempted).astype(str)
+            ),
+            "trap": np.where(trap_bonus.notna(), int_strings(trap_bonus.fillna(0)), "—"),
+            "inv": int_strings(df["invalid_responses"]),
+            **common_tail,
+        }
+    else:
+        columns = {
+            "model": model_cell,
+            "date": date,
+            "w": int_strings(df["puzzles_solved"]),
+            "win_pct": df["solve_rate"].astype(float).round(4),
+            "hit_att": np.char.add(
+                np.char.add(int_strings(df["correct_guesses"]), "/"),
+                int_strings(df["total_guesses"]),
+            ),
+            "acc_pct": df["guess_accuracy"].astype(float).round(4),
+            **common_tail,
         }
 
-        if mode == "oneshot":
-            # correct_guesses = groups matched; 4 groups possible per puzzle.
-            grp_hit = int(row["correct_guesses"])
-            grp_max = 4 * int(row["puzzles_attempted"])
-            max_score = row.get("max_score")
-            max_score = (
-                int(max_score)
-                if max_score is not None and not pd.isna(max_score)
-                else 5 * int(row["puzzles_attempted"])
-            )
-            trap_bonus = row.get("total_trap_bonus")
-            trap_cell = "—" if trap_bonus is None or pd.isna(trap_bonus) else str(int(trap_bonus))
-            rows.append({
-                "model": model_cell,
-                "date": date,
-                "pts": int(row["total_score"]),
-                "pts_pct": round(float(row["total_score"]) / max_score, 4) if max_score else 0.0,
-                "w": str(int(row["puzzles_solved"])),
-                "grp": f"{grp_hit}/{grp_max}",
-                "trap": trap_cell,
-                "inv": str(int(row["invalid_responses"])),
-                **common_tail,
-            })
-        else:
-            hit = int(row["correct_guesses"])
-            att = int(row["total_guesses"])
-            rows.append({
-                "model": model_cell,
-                "date": date,
-                "w": str(int(row["puzzles_solved"])),
-                "win_pct": round(float(row["solve_rate"]), 4),
-                "hit_att": f"{hit}/{att}",
-                "acc_pct": round(float(row["guess_accuracy"]), 4),
-                **common_tail,
-            })
+    # Zip the columns into records directly; tolist() already yields native
+    # Python scalars, so there's no need for a DataFrame round trip.
+    keys = list(columns)
+    return [
+        dict(zip(keys, row))
+        for row in zip(*(np.asarray(col).tolist() for col in columns.values()))
+    ]
 
-    return rows
+
+def nav_link_markdown(mode: str) -> str:
+    label, href = NAV_LINKS[mode]
+    return f"[{label}]({href})"
+
+
+# Markdown links to either leaderboard page, turned into anchors after
+# rendering. Scoped to the two known hrefs so table JSON is never touched.
+NAV_LINK_RE = re.compile(r"\[([^\[\]]+)\]\((classic\.html|index\.html)\)")
+
+# Pin mviz: leaving this unversioned silently broke sortable/filter when a
+# newer mviz shipped a regression. Bump deliberately when validated locally.
+MVIZ_VERSION = "1.6.7"
+
+# Appended to mviz's stylesheet after rendering.
+OVERRIDE_CSS = """
+    .dashboard { zoom: 1.5; }
+    body.theme-dark .data-table a { color: #5cb8e6; }
+    body.theme-dark .data-table a:visited { color: #b39ddb; }
+    .data-table td:nth-child(2) { white-space: nowrap; }
+"""
 
 
 def write_mviz_markdown(
@@ -213,7 +325,7 @@ def write_mviz_markdown(
         intro = (
             f"Latest one-shot runs for {num_models} models (20 games each, one submission per game, "
             f"max 100 pts; sorted by points, avg time, cost) · "
-            f"[Classic (multi-turn) leaderboard →](classic.html)"
+            f"{nav_link_markdown(mode)}"
         )
         columns = [
             {"id": "model", "title": "Model", "bold": True},
@@ -231,7 +343,7 @@ def write_mviz_markdown(
         intro = (
             f"Latest classic (multi-turn) runs for {num_models} models (20 games each, "
             f"sorted by solve rate, avg time, cost) · "
-            f"[← One-shot leaderboard](index.html)"
+            f"{nav_link_markdown(mode)}"
         )
         columns = [
             {"id": "model", "title": "Model", "bold": True},
@@ -243,18 +355,15 @@ def write_mviz_markdown(
             *common_tail_columns,
         ]
 
-    table_spec = json.dumps(
-        {
-            "columns": columns,
-            "data": data,
-            "size": [16, "auto"],
-            "sortable": True,
-            "filter": True,
-        },
-        indent=2,
-    )
+    table_spec = {
+        "columns": columns,
+        "data": data,
+        "size": [16, "auto"],
+        "sortable": True,
+        "filter": True,
+    }
 
-    md_content = f"""---
+    header = f"""---
 theme: light
 title: {title}
 orientation: landscape
@@ -264,25 +373,75 @@ continuous: true
 {intro}
 
 ```table
-{table_spec}
-```
 """
 
+    # Stream the table JSON straight into the file rather than building it
+    # (and then the whole document) as intermediate strings.
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(md_content)
+        f.write(header)
+        json.dump(table_spec, f, indent=2)
+        f.write("\n```\n")
 
     print(f"mviz markdown written to {output_path}")
 
 
+def apply_html_overrides(html: str) -> str:
+    """Add OVERRIDE_CSS and turn the nav markdown links into anchors."""
+    # Collect (offset, length, replacement) edits against the original text and
+    # splice them in one pass, instead of copying the whole document once per
+    # str.replace.
+    edits = []
+    style_end = html.find("</style>")
+    if style_end != -1:
+        edits.append((style_end, 0, OVERRIDE_CSS))
+
+    # mviz renders the intro line as plain text (no markdown/HTML), so convert
+    # every cross-page markdown link to an anchor here.
+    for m in NAV_LINK_RE.finditer(html):
+        edits.append((m.start(), m.end() - m.start(), f'<a href="{m[2]}">{m[1]}</a>'))
+
+    pieces = []
+    pos = 0
+    for offset, length, replacement in sorted(edits):
+        pieces.append(html[pos:offset])
+        pieces.append(replacement)
+        pos = offset + length
+    pieces.append(html[pos:])
+    return "".join(pieces)
+
+
 def render_html(
     md_path: str = "docs/results.md",
     html_path: str = "docs/index.html",
+    cache_dir: str = "results",
 ):
-    """Run npx mviz to render markdown to HTML, then apply CSS fixes."""
-    # Pin mviz: leaving this unversioned silently broke sortable/filter when a
-    # newer mviz shipped a regression. Bump deliberately when validated locally.
-    MVIZ_VERSION = "1.6.7"
+    """Run npx mviz to render markdown to HTML, then apply CSS fixes.
+
+    Skipped when the markdown (and the renderer settings) are unchanged since
+    the last successful render and the HTML is still on disk. The render hash
+    lives in ``cache_dir`` (gitignored) so it is never published with docs/.
+    """
+    # Only needed when a page is actually rendered; keep them off the
+    # import path for the no-data and library-use cases.
+    import hashlib
+    import subprocess
+
+    html_file = Path(html_path)
+    hash_file = Path(cache_dir) / f".latest_runs_render_{html_file.name}.hash"
+    render_hash = hashlib.blake2b(
+        "\0".join(
+            [Path(md_path).read_text(encoding="utf-8"), MVIZ_VERSION, OVERRIDE_CSS, NAV_LINK_RE.pattern]
+        ).encode("utf-8")
+    ).hexdigest()
+    if (
+        html_file.exists()
+        and hash_file.exists()
+        and hash_file.read_text(encoding="utf-8").strip() == render_hash
+    ):
+        print(f"{md_path} unchanged; keeping {html_path}")
+        return
+
     result = subprocess.run(
         ["npx", "--yes", f"mviz@{MVIZ_VERSION}", md_path, "-o", html_path],
         capture_output=True,
@@ -292,37 +451,19 @@ def render_html(
         print(f"mviz stderr: {result.stderr}")
         raise RuntimeError(f"mviz failed with exit code {result.returncode}")
 
-    with open(html_path, "r", encoding="utf-8") as f:
-        html = f.read()
-
-    override_css = """
-    .dashboard { zoom: 1.5; }
-    body.theme-dark .data-table a { color: #5cb8e6; }
-    body.theme-dark .data-table a:visited { color: #b39ddb; }
-    .data-table td:nth-child(2) { white-space: nowrap; }
-"""
-    html = html.replace("</style>", override_css + "</style>", 1)
-
-    # mviz renders the intro line as plain text (no markdown/HTML), so convert
-    # our cross-page markdown links to anchors here. Scoped to the two known
-    # leaderboard hrefs so table JSON is never touched.
-    import re
-    html = re.sub(
-        r"\[([^\[\]]+)\]\((classic\.html|index\.html)\)",
-        r'<a href="\2">\1</a>',
-        html,
-    )
+    html = apply_html_overrides(html_file.read_text(encoding="utf-8"))
 
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    # Encode once and hand the bytes over in a single write.
+    html_file.write_bytes(html.encode("utf-8"))
+    hash_file.parent.mkdir(parents=True, exist_ok=True)
+    hash_file.write_text(render_hash + "\n", encoding="utf-8")
 
     print(f"HTML rendered to {html_path}")
 
 
 def inject_table_link_into_readme(readme_path: str = "README.md"):
     """Inject a link to the HTML table into README.md."""
-    with open(readme_path, "r", encoding="utf-8") as f:
-        readme_content = f.read()
+    readme_content = Path(readme_path).read_text(encoding="utf-8")
 
     results_section = """## Latest Results
 
@@ -332,35 +473,34 @@ def inject_table_link_into_readme(readme_path: str = "README.md"):
 
 """
 
-    if "## Latest Results" in readme_content:
-        start_idx = readme_content.find("## Latest Results")
-        end_idx = readme_content.find("## License", start_idx)
-        if end_idx != -1:
-            new_readme = (
-                readme_content[:start_idx] + results_section + readme_content[end_idx:]
-            )
-        else:
+    # One partition per anchor: each scans the README at most once. The new
+    # README is written piecewise rather than concatenated first.
+    head, results_anchor, tail = readme_content.partition("## Latest Results")
+    if results_anchor:
+        old_section, license_anchor, after_license = tail.partition("## License")
+        if not license_anchor:
             print("Could not find License section to place results before")
             return False
+        if results_anchor + old_section == results_section:
+            print(f"Results link in {readme_path} already up to date")
+            return True
+        pieces = [head, results_section, license_anchor, after_license]
     else:
-        license_idx = readme_content.find("## License")
-        if license_idx != -1:
-            new_readme = (
-                readme_content[:license_idx]
-                + results_section
-                + readme_content[license_idx:]
-            )
+        head, license_anchor, after_license = readme_content.partition("## License")
+        if license_anchor:
+            pieces = [head, results_section, license_anchor, after_license]
         else:
-            new_readme = readme_content + "\n\n" + results_section
+            pieces = [readme_content, "\n\n", results_section]
 
     with open(readme_path, "w", encoding="utf-8") as f:
-        f.write(new_readme)
+        f.writelines(pieces)
 
     print(f"HTML table link injected into {readme_path}")
     return True
 
 
 def main():
+    csv_file = "results/run_summaries.csv"
     pages = [
         ("oneshot", "docs/results.md", "docs/index.html"),
         ("classic", "docs/classic.md", "docs/classic.html"),
@@ -368,7 +508,10 @@ def main():
 
     for mode, md_path, html_path in pages:
         print(f"Creating mviz results table for {mode} mode...")
-        df = load_and_filter_data("results/run_summaries.csv", mode=mode)
+        df = read_cached_data(csv_file, mode)
+        if df is None:
+            df = load_and_filter_data(csv_file, mode=mode)
+            write_cached_data(df, csv_file, mode)
 
         if df.empty:
             # No runs for this mode yet (e.g. oneshot before the backfill).
@@ -377,16 +520,18 @@ def main():
             continue
 
         print(f"Found {len(df)} models meeting criteria")
-        for i, (_, row) in enumerate(df.iterrows(), 1):
-            if mode == "oneshot":
-                print(
-                    f"  {i:2d}. {row['model']:15s}: {int(row['total_score']):3d} pts, "
-                    f"${row['eval_cost']:5.2f} cost"
-                )
-            else:
+        if mode == "oneshot":
+            ranked = df[["model", "total_score", "eval_cost"]].itertuples(index=False, name=None)
+            for i, (model, total_score, eval_cost) in enumerate(ranked, 1):
+                print(f"  {i:2d}. {model:15s}: {int(total_score):3d} pts, ${eval_cost:5.2f} cost")
+        else:
+            ranked = df[["model", "solve_rate", "eval_cost", "guess_accuracy"]].itertuples(
+                index=False, name=None
+            )
+            for i, (model, solve_rate, eval_cost, guess_accuracy) in enumerate(ranked, 1):
                 print(
-                    f"  {i:2d}. {row['model']:15s}: {row['solve_rate']:5.1%} solve rate, "
-                    f"${row['eval_cost']:5.2f} cost, {row['guess_accuracy']:5.1%} accuracy"
+                    f"  {i:2d}. {model:15s}: {solve_rate:5.1%} solve rate, "
+                    f"${eval_cost:5.2f} cost, {guess_accuracy:5.1%} accuracy"
                 )
 
         write_mviz_markdown(df, md_path, mode=mode)
@@ -1,32 +1,97 @@
 """Remove duplicate rows from controllog.events and controllog.postings in MotherDuck.
 
 Strategy:
-  1. Create clean tables with a canonical schema (fixing schema drift)
-  2. INSERT deduplicated rows using ROW_NUMBER() partitioned by idempotency_key/posting_id
-  3. Drop the old tables and rename the clean ones
+  1. Rebuild each table with a canonical schema (fixing schema drift)
+  2. Keep one row per idempotency_key/posting_id using QUALIFY ROW_NUMBER() = 1
+  3. Only tables with duplicates are rebuilt, via CREATE OR REPLACE in one transaction
 
 Usage:
   uv run python scripts/dedupe_motherduck.py
 
   Or dry-run (prints counts only, no changes):
   uv run python scripts/dedupe_motherduck.py --dry-run
+
+Local DuckDB resources can be tuned through the environment:
+  DUCKDB_THREADS       worker threads (DuckDB defaults to all cores)
+  DUCKDB_MEMORY_LIMIT  e.g. 8GB (DuckDB defaults to 80% of RAM)
 """
 
 import os
 import sys
 import duckdb  # type: ignore
 
+from duckdb_settings import duckdb_config
+
+
+# CREATE OR REPLACE reads the old table and swaps in the new one atomically,
+# so there is no window where a table name is missing and no *_clean staging
+# copy to drop and rename. The ORDER BY clusters the rewritten rows so the
+# per-row-group min/max stats can skip most of the table on later lookups.
+# Duplicates are dropped in the inner query, so the canonical-schema casts
+# only run on the rows that survive.
+DEDUPE_EVENTS_SQL = """
+    CREATE OR REPLACE TABLE controllog.events AS
+    SELECT
+        event_id::UUID AS event_id,
+        event_time::VARCHAR AS event_time,
+        kind::VARCHAR AS kind,
+        actor_agent_id::VARCHAR AS actor_agent_id,
+        actor_task_id::VARCHAR AS actor_task_id,
+        project_id::VARCHAR AS project_id,
+        run_id::VARCHAR AS run_id,
+        source::VARCHAR AS source,
+        idempotency_key::VARCHAR AS idempotency_key,
+        payload_json
+    FROM (
+        SELECT *
+        FROM controllog.events
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY COALESCE(idempotency_key, event_id::VARCHAR)
+            ORDER BY event_time
+        ) = 1
+    )
+    ORDER BY event_time;
+"""
+
+DEDUPE_POSTINGS_SQL = """
+    CREATE OR REPLACE TABLE controllog.postings AS
+    SELECT
+        posting_id::UUID AS posting_id,
+        event_id::UUID AS event_id,
+        account_type::VARCHAR AS account_type,
+        account_id::VARCHAR AS account_id,
+        unit::VARCHAR AS unit,
+        delta_numeric::DOUBLE AS delta_numeric,
+        dims_json
+    FROM (
+        SELECT *
+        FROM controllog.postings
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY posting_id) = 1
+    )
+    ORDER BY event_id, posting_id;
+"""
+
 
 def dedupe(target_db: str, dry_run: bool = False) -> None:
-    con = duckdb.connect(target_db)
+    con = duckdb.connect(target_db, config=duckdb_config())
 
     # --- Report current state ---
-    events_before = con.execute(
-        "SELECT COUNT(*) as total, COUNT(DISTINCT COALESCE(idempotency_key, event_id::VARCHAR)) as uniq FROM controllog.events"
-    ).fetchone()
-    postings_before = con.execute(
-        "SELECT COUNT(*) as total, COUNT(DISTINCT posting_id) as uniq FROM controllog.postings"
-    ).fetchone()
+    # One round trip for all four counts; MotherDuck latency dominates here.
+    ev_total, ev_uniq, po_total, po_uniq = con.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM controllog.events),
+            -- Unique counts use the same keys as the rebuilds' PARTITION BY,
+            -- which keeps one row for a NULL key; COUNT(DISTINCT) skips NULLs.
+            (SELECT COUNT(DISTINCT COALESCE(idempotency_key, event_id::VARCHAR))
+                    + (COUNT(*) FILTER (WHERE idempotency_key IS NULL AND event_id IS NULL) > 0)::INT
+             FROM controllog.events),
+            (SELECT COUNT(*) FROM controllog.postings),
+            (SELECT COUNT(DISTINCT posting_id)
+                    + (COUNT(*) FILTER (WHERE posting_id IS NULL) > 0)::INT
+             FROM controllog.postings)
+    """).fetchone()
+    events_before = (ev_total, ev_uniq)
+    postings_before = (po_total, po_uniq)
 
     print(f"Events:   {events_before[0]} total, {events_before[1]} unique, {events_before[0] - events_before[1]} duplicates")
     print(f"Postings: {postings_before[0]} total, {postings_before[1]} unique, {postings_before[0] - postings_before[1]} duplicates")
@@ -36,74 +101,44 @@ def dedupe(target_db: str, dry_run: bool = False) -> None:
         con.close()
         return
 
-    if events_before[0] == events_before[1] and postings_before[0] == postings_before[1]:
+    # Only rebuild the tables that actually have duplicates.
+    statements = []
+    if events_before[0] != events_before[1]:
+        statements.append(DEDUPE_EVENTS_SQL)
+    if postings_before[0] != postings_before[1]:
+        statements.append(DEDUPE_POSTINGS_SQL)
+
+    if not statements:
         print("\nNo duplicates found. Nothing to do.")
         con.close()
         return
 
     print("\nDeduplicating...")
 
-    # --- Dedupe events ---
-    con.execute("""
-        CREATE TABLE controllog.events_clean AS
-        SELECT
-            event_id::UUID AS event_id,
-            event_time::VARCHAR AS event_time,
-            kind::VARCHAR AS kind,
-            actor_agent_id::VARCHAR AS actor_agent_id,
-            actor_task_id::VARCHAR AS actor_task_id,
-            project_id::VARCHAR AS project_id,
-            run_id::VARCHAR AS run_id,
-            source::VARCHAR AS source,
-            idempotency_key::VARCHAR AS idempotency_key,
-            payload_json
-        FROM (
-            SELECT *,
-                ROW_NUMBER() OVER (
-                    PARTITION BY COALESCE(idempotency_key, event_id::VARCHAR)
-                    ORDER BY event_time
-                ) AS rn
-            FROM controllog.events
-        )
-        WHERE rn = 1
-    """)
-
-    # --- Dedupe postings ---
-    con.execute("""
-        CREATE TABLE controllog.postings_clean AS
+    # --- Dedupe in place (one batch, one transaction) ---
+    # Check the rebuilt row counts before COMMIT so a bad rebuild can still be
+    # rolled back.
+    con.execute("BEGIN TRANSACTION;" + "".join(statements))
+
+    events_after, postings_after = con.execute("""
         SELECT
-            posting_id::UUID AS posting_id,
-            event_id::UUID AS event_id,
-            account_type::VARCHAR AS account_type,
-            account_id::VARCHAR AS account_id,
-            unit::VARCHAR AS unit,
-            delta_numeric::DOUBLE AS delta_numeric,
-            dims_json
-        FROM (
-            SELECT *,
-                ROW_NUMBER() OVER (
-                    PARTITION BY posting_id
-                ) AS rn
-            FROM controllog.postings
-        )
-        WHERE rn = 1
-    """)
-
-    # --- Verify counts before swap ---
-    events_after = con.execute("SELECT COUNT(*) FROM controllog.events_clean").fetchone()[0]
-    postings_after = con.execute("SELECT COUNT(*) FROM controllog.postings_clean").fetchone()[0]
+            (SELECT COUNT(*) FROM controllog.events),
+            (SELECT COUNT(*) FROM controllog.postings)
+    """).fetchone()
 
     print(f"Events:   {events_before[0]} -> {events_after} (removed {events_before[0] - events_after})")
     print(f"Postings: {postings_before[0]} -> {postings_after} (removed {postings_before[0] - postings_after})")
 
-    # --- Swap tables ---
-    con.execute("DROP TABLE controllog.events")
-    con.execute("ALTER TABLE controllog.events_clean RENAME TO events")
+    if events_after != events_before[1] or postings_after != postings_before[1]:
+        print(f"WARNING: expected {events_before[1]} events and {postings_before[1]} postings")
+        con.execute("ROLLBACK")
+        print("Aborted. Rolled back.")
+        con.close()
+        sys.exit(1)
 
-    con.execute("DROP TABLE controllog.postings")
-    con.execute("ALTER TABLE controllog.postings_clean RENAME TO postings")
+    con.execute("COMMIT")
 
-    print("\nDone. Tables swapped successfully.")
+    print("\nDone. Tables replaced successfully.")
     con.close()
 
 
@@ -0,0 +1,19 @@
+"""DuckDB connection settings shared by the scripts in this directory.
+
+Local DuckDB resources can be tuned through the environment:
+  DUCKDB_THREADS       worker threads (DuckDB defaults to all cores)
+  DUCKDB_MEMORY_LIMIT  e.g. 8GB (DuckDB defaults to 80% of RAM)
+"""
+
+import os
+from typing import Any, Dict
+
+
+def duckdb_config() -> Dict[str, Any]:
+    """DuckDB connection settings taken from DUCKDB_THREADS / DUCKDB_MEMORY_LIMIT."""
+    config: Dict[str, Any] = {}
+    if threads := os.environ.get("DUCKDB_THREADS"):
+        config["threads"] = int(threads)
+    if memory_limit := os.environ.get("DUCKDB_MEMORY_LIMIT"):
+        config["memory_limit"] = memory_limit
+    return config
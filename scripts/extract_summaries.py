@@ -1,358 +1,406 @@
 #!/usr/bin/env python3
-"""Extract run summaries from MotherDuck controllog and create a CSV report."""
+"""Extract run summaries from MotherDuck controllog and create a CSV report.
+
+Usage:
+  uv run python scripts/extract_summaries.py
+
+  Or also write a typed Parquet copy (results/run_summaries.parquet):
+  uv run python scripts/extract_summaries.py --parquet
+
+Local DuckDB resources can be tuned through the environment:
+  DUCKDB_THREADS       worker threads (DuckDB defaults to all cores)
+  DUCKDB_MEMORY_LIMIT  e.g. 8GB (DuckDB defaults to 80% of RAM)
+"""
 
-import csv
 import os
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
 import duckdb  # type: ignore
 
+from duckdb_settings import duckdb_config
 
-def extract_run_summaries_from_motherduck(db: str = "md:") -> List[Dict[str, Any]]:
-    """Extract all run summaries by aggregating from controllog events and postings."""
-    summaries = []
-    
-    print(f"Connecting to MotherDuck database: {db}")
-    con = duckdb.connect(db)
-    
-    try:
-        # Query to aggregate run summaries from controllog events and postings
-        # This aggregates metrics per run_id
-        # Note: payload_json and dims_json are STRUCT types, not JSON, so we use dot notation
-        query = """
-        WITH run_metadata AS (
-            -- Get run metadata (model, timestamps) from events
-            -- Model is in payload_json.model for model_prompt/model_completion events
-            SELECT
-                e.run_id,
-                MAX(CASE WHEN e.kind IN ('model_prompt', 'model_completion') THEN e.payload_json.model END) AS model,
-                MIN(e.event_time) AS start_timestamp,
-                MAX(e.event_time) AS end_timestamp
-            FROM controllog.events e
-            WHERE e.run_id IS NOT NULL
-              AND e.run_id NOT LIKE '%sherlock%'
-            GROUP BY e.run_id
-        ),
-        puzzle_stats AS (
-            -- Count puzzles attempted and solved per run
-            -- puzzles_attempted: count all unique puzzle_ids from any event
-            -- puzzles_solved: count puzzles that reached DONE state (from postings)
-            SELECT 
-                e.run_id,
-                COUNT(DISTINCT e.payload_json.puzzle_id) AS puzzles_attempted,
-                COUNT(DISTINCT CASE 
-                    WHEN p.dims_json."to" = 'DONE' 
-                    THEN e.payload_json.puzzle_id 
-                END) AS puzzles_solved
-            FROM controllog.events e
-            LEFT JOIN controllog.postings p ON p.event_id = e.event_id AND p.account_type = 'truth.state'
-            WHERE e.run_id IS NOT NULL
-            AND e.payload_json.puzzle_id IS NOT NULL
-            GROUP BY e.run_id
-        ),
-        guess_stats AS (
-            -- Aggregate guess statistics from model_completion events, plus
-            -- model_response_error events (needed for one-shot mode detection:
-            -- an all-error one-shot run has no completions, and its error events
-            -- carry result ONESHOT_API_ERROR_MAX_M).
-            -- Classic results: CORRECT / INCORRECT / INVALID prefixes.
-            -- One-shot results (4.0 trap scoring): ONESHOT_SCORE_S_GROUPS_G_TRAP_T_MAX_M
-            -- (S = total incl. trap bonus, G = groups matched, T = 0|2, M = per-puzzle
-            -- max 5|3) or ONESHOT_INVALID_MAX_M. Legacy pre-trap runs used bare
-            -- ONESHOT_SCORE_N (N in 0,1,2,5; groups = LEAST(N, 4); max 5) — the
-            -- fallbacks below.
-            SELECT
-                e.run_id,
-                COUNT(CASE WHEN e.kind = 'model_completion' THEN 1 END) AS total_guesses,
-                COUNT(CASE WHEN e.payload_json.result = 'CORRECT' OR e.payload_json.result LIKE 'CORRECT%' THEN 1 END)
-                  + COALESCE(SUM(CASE WHEN e.payload_json.result LIKE 'ONESHOT_SCORE_%' THEN
-                        COALESCE(TRY_CAST(NULLIF(regexp_extract(e.payload_json.result, 'GROUPS_([0-9]+)', 1), '') AS INTEGER),
-                                 LEAST(CAST(regexp_extract(e.payload_json.result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER), 4))
-                      END), 0) AS correct_guesses,
-                COUNT(CASE WHEN e.payload_json.result LIKE 'INCORRECT%' THEN 1 END)
-                  + COALESCE(SUM(CASE WHEN e.payload_json.result LIKE 'ONESHOT_SCORE_%' THEN
-                        4 - COALESCE(TRY_CAST(NULLIF(regexp_extract(e.payload_json.result, 'GROUPS_([0-9]+)', 1), '') AS INTEGER),
-                                     LEAST(CAST(regexp_extract(e.payload_json.result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER), 4))
-                      END), 0) AS incorrect_guesses,
-                COUNT(CASE WHEN e.payload_json.result LIKE 'INVALID%' OR e.payload_json.result LIKE 'ONESHOT_INVALID%' THEN 1 END) AS invalid_responses,
-                MAX(CASE WHEN e.payload_json.result LIKE 'ONESHOT%' THEN 'oneshot' END) AS oneshot_mode,
-                SUM(CASE WHEN e.payload_json.result LIKE 'ONESHOT_SCORE_%' THEN
-                    CAST(regexp_extract(e.payload_json.result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER) END) AS total_score,
-                SUM(CASE WHEN e.payload_json.result LIKE 'ONESHOT_SCORE_%' THEN
-                    COALESCE(TRY_CAST(NULLIF(regexp_extract(e.payload_json.result, 'TRAP_([0-9]+)', 1), '') AS INTEGER), 0)
-                    END) AS total_trap_bonus,
-                -- Per-puzzle score ceiling summed across ALL one-shot events
-                -- (completions, invalids, API errors); legacy rows without a
-                -- MAX_ tag count 5 each.
-                SUM(CASE WHEN e.payload_json.result LIKE 'ONESHOT%' THEN
-                    COALESCE(TRY_CAST(NULLIF(regexp_extract(e.payload_json.result, 'MAX_([0-9]+)', 1), '') AS INTEGER), 5)
-                    END) AS oneshot_max_score,
-                -- Distinguishes trap-scoring runs from legacy pre-trap smoke
-                -- runs whose scores aren't comparable. Trap-era results carry
-                -- _TRAP_ (scored) or _MAX_ (invalid/API-error verdicts), so an
-                -- all-invalid run still counts as trap-era.
-                MAX(CASE WHEN e.payload_json.result LIKE '%\\_TRAP\\_%' ESCAPE '\\'
-                          OR e.payload_json.result LIKE '%\\_MAX\\_%' ESCAPE '\\'
-                     THEN 1 ELSE 0 END) AS trap_scored
-            FROM controllog.events e
-            WHERE e.run_id IS NOT NULL
-            AND e.kind IN ('model_completion', 'model_response_error')
-            GROUP BY e.run_id
-        ),
-        token_stats AS (
-            -- Aggregate token and cost statistics from postings
-            -- Tokens: filter to provider: account_id to avoid double-counting (project: has identical values)
-            -- Money: already filtered by specific vendor: prefixes, no duplication risk
-            SELECT
-                e.run_id,
-                -- Total tokens: sum of all token postings (both prompt and completion phases)
-                SUM(CASE WHEN p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.dims_json.phase = 'prompt' THEN ABS(p.delta_numeric) ELSE 0 END) +
-                SUM(CASE WHEN p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.dims_json.phase = 'completion' THEN ABS(p.delta_numeric) ELSE 0 END) AS total_tokens,
-                -- Prompt tokens
-                SUM(CASE WHEN p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.dims_json.phase = 'prompt' THEN ABS(p.delta_numeric) ELSE 0 END) AS total_prompt_tokens,
-                -- Completion tokens
-                SUM(CASE WHEN p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.dims_json.phase = 'completion' THEN ABS(p.delta_numeric) ELSE 0 END) AS total_completion_tokens,
-                -- OpenRouter cost (vendor:openrouter)
-                SUM(CASE WHEN p.account_type = 'resource.money' AND p.unit = '$' AND p.account_id LIKE 'vendor:openrouter%' THEN ABS(p.delta_numeric) ELSE 0 END) AS total_cost,
-                -- Upstream cost (vendor:upstream)
-                SUM(CASE WHEN p.account_type = 'resource.money' AND p.unit = '$' AND p.account_id LIKE 'vendor:upstream%' THEN ABS(p.delta_numeric) ELSE 0 END) AS total_upstream_cost
-            FROM controllog.postings p
-            JOIN controllog.events e ON p.event_id = e.event_id
-            WHERE e.run_id IS NOT NULL
-              AND (p.account_id LIKE 'vendor:%' OR p.account_id LIKE 'provider:%')
-            GROUP BY e.run_id
-        ),
-        time_stats AS (
-            -- Aggregate time statistics from postings.
-            -- Filter to project: account_id to avoid double-counting (agent: has identical values).
-            -- total_time_sec is wall time; total_backoff_sec is time spent in retry backoff
-            -- (e.g. upstream 429s). Historical runs have no backoff postings -> NULL.
-            -- NULL-safe kind lookup: legacy postings pre-date the dims_json.kind field.
+
+# Columns written to the CSV, in order.
+SUMMARY_COLUMNS = [
+    "log_file",
+    "run_id",
+    "model",
+    "timestamp",
+    "seed",
+    "puzzles_attempted",
+    "puzzles_solved",
+    "solve_rate",
+    "total_guesses",
+    "correct_guesses",
+    "incorrect_guesses",
+    "invalid_responses",
+    "guess_accuracy",
+    "mode",
+    "total_score",
+    "total_trap_bonus",
+    "max_score",
+    "avg_score",
+    "trap_scored",
+    "avg_time_sec",
+    "total_time_sec",
+    "avg_inference_sec",
+    "total_inference_sec",
+    "total_backoff_sec",
+    "total_tokens",
+    "total_prompt_tokens",
+    "total_completion_tokens",
+    "token_count_method",
+    "total_cost",
+    "total_upstream_cost",
+    "start_timestamp",
+    "end_timestamp",
+]
+
+
+def extract_run_summaries_from_motherduck(con: duckdb.DuckDBPyConnection) -> int:
+    """Aggregate all run summaries from controllog events and postings.
+
+    The results stay in DuckDB, in a ``run_summaries`` temp table on ``con``;
+    returns the number of runs found.
+    """
+    # Query to aggregate run summaries from controllog events and postings
+    # This aggregates metrics per run_id
+    # Note: payload_json and dims_json are STRUCT types, not JSON, so we use dot notation
+    query = """
+    WITH events_flat AS (
+        -- The event columns the aggregates below read, with the STRUCT fields
+        -- projected out once so every later step works on plain columns.
+        SELECT
+            event_id,
+            run_id,
+            kind,
+            event_time,
+            payload_json.model AS model,
+            payload_json.puzzle_id AS puzzle_id,
+            -- Only completions and response errors carry a guess verdict.
+            CASE WHEN kind IN ('model_completion', 'model_response_error')
+                 THEN payload_json.result END AS guess_result
+        FROM controllog.events
+        WHERE run_id IS NOT NULL
+    ),
+    postings_flat AS (
+        -- Likewise for postings.
+        SELECT
+            event_id,
+            account_type,
+            account_id,
+            unit,
+            delta_numeric,
+            dims_json.phase AS phase,
+            dims_json."to" AS to_state,
+            dims_json.kind AS time_kind
+        FROM controllog.postings
+    ),
+    run_metadata AS (
+        -- Get run metadata (model, timestamps) and guess statistics from
+        -- events, in one pass.
+        -- Model is in payload_json.model for model_prompt/model_completion events
+        -- Guess statistics come from model_completion events, plus
+        -- model_response_error events (needed for one-shot mode detection:
+        -- an all-error one-shot run has no completions, and its error events
+        -- carry result ONESHOT_API_ERROR_MAX_M).
+        -- Classic results: CORRECT / INCORRECT / INVALID prefixes.
+        -- One-shot results (4.0 trap scoring): ONESHOT_SCORE_S_GROUPS_G_TRAP_T_MAX_M
+        -- (S = total incl. trap bonus, G = groups matched, T = 0|2, M = per-puzzle
+        -- max 5|3) or ONESHOT_INVALID_MAX_M. Legacy pre-trap runs used bare
+        -- ONESHOT_SCORE_N (N in 0,1,2,5; groups = LEAST(N, 4); max 5) — the
+        -- fallbacks below.
+        SELECT
+            e.run_id,
+            MAX(CASE WHEN e.kind IN ('model_prompt', 'model_completion') THEN e.model END) AS model,
+            MIN(e.event_time) AS start_timestamp,
+            MAX(e.event_time) AS end_timestamp,
+            COUNT(CASE WHEN e.kind = 'model_completion' THEN 1 END) AS total_guesses,
+            COUNT(CASE WHEN starts_with(e.guess_result, 'CORRECT') THEN 1 END)
+              + COALESCE(SUM(CASE WHEN starts_with(e.guess_result, 'ONESHOT_SCORE_') THEN
+                    COALESCE(TRY_CAST(NULLIF(regexp_extract(e.guess_result, 'GROUPS_([0-9]+)', 1), '') AS INTEGER),
+                             LEAST(CAST(regexp_extract(e.guess_result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER), 4))
+                  END), 0) AS correct_guesses,
+            COUNT(CASE WHEN starts_with(e.guess_result, 'INCORRECT') THEN 1 END)
+              + COALESCE(SUM(CASE WHEN starts_with(e.guess_result, 'ONESHOT_SCORE_') THEN
+                    4 - COALESCE(TRY_CAST(NULLIF(regexp_extract(e.guess_result, 'GROUPS_([0-9]+)', 1), '') AS INTEGER),
+                                 LEAST(CAST(regexp_extract(e.guess_result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER), 4))
+                  END), 0) AS incorrect_guesses,
+            COUNT(CASE WHEN starts_with(e.guess_result, 'INVALID') OR starts_with(e.guess_result, 'ONESHOT_INVALID') THEN 1 END) AS invalid_responses,
+            MAX(CASE WHEN starts_with(e.guess_result, 'ONESHOT') THEN 'oneshot' END) AS oneshot_mode,
+            SUM(CASE WHEN starts_with(e.guess_result, 'ONESHOT_SCORE_') THEN
+                CAST(regexp_extract(e.guess_result, 'ONESHOT_SCORE_([0-9]+)', 1) AS INTEGER) END) AS total_score,
+            SUM(CASE WHEN starts_with(e.guess_result, 'ONESHOT_SCORE_') THEN
+                COALESCE(TRY_CAST(NULLIF(regexp_extract(e.guess_result, 'TRAP_([0-9]+)', 1), '') AS INTEGER), 0)
+                END) AS total_trap_bonus,
+            -- Per-puzzle score ceiling summed across ALL one-shot events
+            -- (completions, invalids, API errors); legacy rows without a
+            -- MAX_ tag count 5 each.
+            SUM(CASE WHEN starts_with(e.guess_result, 'ONESHOT') THEN
+                COALESCE(TRY_CAST(NULLIF(regexp_extract(e.guess_result, 'MAX_([0-9]+)', 1), '') AS INTEGER), 5)
+                END) AS oneshot_max_score,
+            -- Distinguishes trap-scoring runs from legacy pre-trap smoke
+            -- runs whose scores aren't comparable. Trap-era results carry
+            -- _TRAP_ (scored) or _MAX_ (invalid/API-error verdicts), so an
+            -- all-invalid run still counts as trap-era.
+            MAX(CASE WHEN contains(e.guess_result, '_TRAP_')
+                      OR contains(e.guess_result, '_MAX_')
+                 THEN 1 ELSE 0 END) AS trap_scored
+        FROM events_flat e
+        WHERE e.run_id NOT LIKE '%sherlock%'
+        GROUP BY e.run_id
+    ),
+    done_events AS (
+        -- Events that moved a puzzle to DONE. Only a small slice of postings,
+        -- so puzzle_stats joins against this instead of every truth.state row.
+        SELECT DISTINCT event_id
+        FROM postings_flat
+        WHERE account_type = 'truth.state'
+          AND to_state = 'DONE'
+    ),
+    puzzle_stats AS (
+        -- Count puzzles attempted and solved per run
+        -- puzzles_attempted: count all unique puzzle_ids from any event
+        -- puzzles_solved: count puzzles that reached DONE state (from postings)
+        -- The inner GROUP BY dedupes (run, puzzle) pairs once, so both counts
+        -- are plain counts rather than two COUNT(DISTINCT) hash sets.
+        SELECT
+            run_id,
+            COUNT(*) AS puzzles_attempted,
+            COUNT(*) FILTER (WHERE is_done) AS puzzles_solved
+        FROM (
             SELECT
                 e.run_id,
-                SUM(CASE
-                    WHEN p.account_type = 'resource.time_ms' AND p.unit = 'ms'
-                         AND COALESCE(p.dims_json.kind, 'wall') = 'wall'
-                    THEN ABS(p.delta_numeric) ELSE 0 END) / 1000.0 AS total_time_sec,
-                SUM(CASE
-                    WHEN p.account_type = 'resource.time_ms' AND p.unit = 'ms'
-                         AND p.dims_json.kind = 'backoff'
-                    THEN ABS(p.delta_numeric) END) / 1000.0 AS total_backoff_sec
-            FROM controllog.postings p
-            JOIN controllog.events e ON p.event_id = e.event_id
-            WHERE e.run_id IS NOT NULL
-              AND p.account_id LIKE 'project:%'
-            GROUP BY e.run_id
+                e.puzzle_id,
+                BOOL_OR(d.event_id IS NOT NULL) AS is_done
+            FROM events_flat e
+            LEFT JOIN done_events d ON d.event_id = e.event_id
+            WHERE e.puzzle_id IS NOT NULL
+            GROUP BY e.run_id, e.puzzle_id
         )
-        SELECT 
-            rm.run_id,
-            COALESCE(rm.model, 'unknown') AS model,
-            rm.start_timestamp,
-            rm.end_timestamp,
-            NULL AS seed,  -- Seed not stored in controllog events
-            COALESCE(ps.puzzles_attempted, 0) AS puzzles_attempted,
-            COALESCE(ps.puzzles_solved, 0) AS puzzles_solved,
-            COALESCE(gs.total_guesses, 0) AS total_guesses,
-            COALESCE(gs.correct_guesses, 0) AS correct_guesses,
-            COALESCE(gs.incorrect_guesses, 0) AS incorrect_guesses,
-            COALESCE(gs.invalid_responses, 0) AS invalid_responses,
-            COALESCE(gs.oneshot_mode, 'classic') AS mode,
-            -- COALESCE to 0 for one-shot runs: an all-invalid or all-error run
-            -- has no ONESHOT_SCORE_ rows, but its score is genuinely 0, not NULL.
-            CASE WHEN gs.oneshot_mode = 'oneshot'
-                 THEN COALESCE(gs.total_score, 0) END AS total_score,
-            CASE WHEN gs.oneshot_mode = 'oneshot'
-                 THEN COALESCE(gs.total_trap_bonus, 0) END AS total_trap_bonus,
-            CASE WHEN gs.oneshot_mode = 'oneshot'
-                 THEN COALESCE(gs.oneshot_max_score, 5 * COALESCE(ps.puzzles_attempted, 0)) END AS max_score,
-            CASE WHEN gs.oneshot_mode = 'oneshot'
-                 THEN COALESCE(gs.trap_scored, 0) END AS trap_scored,
-            COALESCE(ts.total_tokens, 0) AS total_tokens,
-            COALESCE(ts.total_prompt_tokens, 0) AS total_prompt_tokens,
-            COALESCE(ts.total_completion_tokens, 0) AS total_completion_tokens,
-            COALESCE(ts.total_cost, 0.0) AS total_cost,
-            COALESCE(ts.total_upstream_cost, 0.0) AS total_upstream_cost,
-            COALESCE(tims.total_time_sec, 0.0) AS total_time_sec,
-            tims.total_backoff_sec AS total_backoff_sec
-        FROM run_metadata rm
-        LEFT JOIN puzzle_stats ps ON rm.run_id = ps.run_id
-        LEFT JOIN guess_stats gs ON rm.run_id = gs.run_id
-        LEFT JOIN token_stats ts ON rm.run_id = ts.run_id
-        LEFT JOIN time_stats tims ON rm.run_id = tims.run_id
-        ORDER BY rm.start_timestamp DESC
-        """
-        
-        print("Querying controllog.events and controllog.postings...")
-        results = con.execute(query).fetchall()
-        columns = [desc[0] for desc in con.description]
-        
-        for row in results:
-            summary = dict(zip(columns, row))
-            # Convert to expected format
-            summary["log_file"] = None  # Not available from MotherDuck
-            summary["timestamp"] = summary.get("start_timestamp")
-            summary["token_count_method"] = "API"  # Default assumption
-            
-            # If model is None, try to extract from run_id (format: YYYY-MM-DDTHH-MM-SS_model)
-            if not summary.get("model") and summary.get("run_id"):
-                parts = summary["run_id"].split("_", 1)
-                if len(parts) > 1:
-                    summary["model"] = parts[1]
-                else:
-                    summary["model"] = "unknown"
-            
-            summaries.append(summary)
-            print(f"  Found run summary: {summary.get('run_id', 'unknown')}")
-        
-    finally:
-        con.close()
+        GROUP BY run_id
+    ),
+    posting_stats AS (
+        -- Token, cost and time statistics from postings, in one pass over the
+        -- postings/events join.
+        -- Tokens: filter to provider: account_id to avoid double-counting (project: has identical values);
+        -- the WHERE leaves only vendor:, provider: and project: accounts, so NOT starts_with 'project:' suffices
+        -- Money: already filtered by specific vendor: prefixes, no duplication risk
+        -- Time: filter to project: account_id to avoid double-counting (agent: has identical values).
+        -- total_time_sec is wall time; total_backoff_sec is time spent in retry backoff
+        -- (e.g. upstream 429s). Historical runs have no backoff postings -> NULL.
+        -- Credits are negative and debits positive; ABS keeps each sum
+        -- independent of which side of the pair an account sits on.
+        -- NULL-safe time_kind lookup: legacy postings pre-date the dims_json.kind field.
+        SELECT
+            e.run_id,
+            -- Prompt tokens
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE NOT starts_with(p.account_id, 'project:') AND p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.phase = 'prompt'
+            ) AS total_prompt_tokens,
+            -- Completion tokens
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE NOT starts_with(p.account_id, 'project:') AND p.account_type = 'resource.tokens' AND p.unit = '+tokens' AND p.phase = 'completion'
+            ) AS total_completion_tokens,
+            -- OpenRouter cost (vendor:openrouter)
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE p.account_type = 'resource.money' AND p.unit = '$' AND starts_with(p.account_id, 'vendor:openrouter')
+            ) AS total_cost,
+            -- Upstream cost (vendor:upstream)
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE p.account_type = 'resource.money' AND p.unit = '$' AND starts_with(p.account_id, 'vendor:upstream')
+            ) AS total_upstream_cost,
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE starts_with(p.account_id, 'project:')
+                  AND p.account_type = 'resource.time_ms' AND p.unit = 'ms'
+                  AND COALESCE(p.time_kind, 'wall') = 'wall'
+            ) / 1000.0 AS total_time_sec,
+            SUM(ABS(p.delta_numeric)) FILTER (
+                WHERE starts_with(p.account_id, 'project:')
+                  AND p.account_type = 'resource.time_ms' AND p.unit = 'ms'
+                  AND p.time_kind = 'backoff'
+            ) / 1000.0 AS total_backoff_sec
+        FROM postings_flat p
+        JOIN events_flat e ON p.event_id = e.event_id
+        WHERE (starts_with(p.account_id, 'vendor:') OR starts_with(p.account_id, 'provider:') OR starts_with(p.account_id, 'project:'))
+        GROUP BY e.run_id
+    ),
+    run_totals AS (
+    SELECT 
+        rm.run_id,
+        -- No run_id-suffix fallback: that is the short alias, not the payload
+        -- id, and 'unknown' is what create_results_mviz.py filters out.
+        COALESCE(rm.model, 'unknown') AS model,
+        rm.start_timestamp,
+        rm.end_timestamp,
+        NULL AS seed,  -- Seed not stored in controllog events
+        COALESCE(ps.puzzles_attempted, 0) AS puzzles_attempted,
+        COALESCE(ps.puzzles_solved, 0) AS puzzles_solved,
+        COALESCE(rm.total_guesses, 0) AS total_guesses,
+        COALESCE(rm.correct_guesses, 0) AS correct_guesses,
+        COALESCE(rm.incorrect_guesses, 0) AS incorrect_guesses,
+        COALESCE(rm.invalid_responses, 0) AS invalid_responses,
+        COALESCE(rm.oneshot_mode, 'classic') AS mode,
+        -- COALESCE to 0 for one-shot runs: an all-invalid or all-error run
+        -- has no ONESHOT_SCORE_ rows, but its score is genuinely 0, not NULL.
+        CASE WHEN rm.oneshot_mode = 'oneshot'
+             THEN COALESCE(rm.total_score, 0) END AS total_score,
+        CASE WHEN rm.oneshot_mode = 'oneshot'
+             THEN COALESCE(rm.total_trap_bonus, 0) END AS total_trap_bonus,
+        CASE WHEN rm.oneshot_mode = 'oneshot'
+             THEN COALESCE(rm.oneshot_max_score, 5 * COALESCE(ps.puzzles_attempted, 0)) END AS max_score,
+        CASE WHEN rm.oneshot_mode = 'oneshot'
+             THEN COALESCE(rm.trap_scored, 0) END AS trap_scored,
+        -- Total tokens: both prompt and completion phases
+        COALESCE(pst.total_prompt_tokens, 0) + COALESCE(pst.total_completion_tokens, 0) AS total_tokens,
+        COALESCE(pst.total_prompt_tokens, 0) AS total_prompt_tokens,
+        COALESCE(pst.total_completion_tokens, 0) AS total_completion_tokens,
+        COALESCE(pst.total_cost, 0.0) AS total_cost,
+        COALESCE(pst.total_upstream_cost, 0.0) AS total_upstream_cost,
+        COALESCE(pst.total_time_sec, 0.0) AS total_time_sec,
+        pst.total_backoff_sec AS total_backoff_sec
+    FROM run_metadata rm
+    LEFT JOIN puzzle_stats ps ON rm.run_id = ps.run_id
+    LEFT JOIN posting_stats pst ON rm.run_id = pst.run_id
+    )
+    -- Derived per-run metrics, computed here rather than row by row in Python.
+    SELECT
+        *,
+        NULL AS log_file,  -- Not available from MotherDuck
+        start_timestamp AS timestamp,
+        'API' AS token_count_method,  -- Default assumption
+        CASE WHEN puzzles_attempted > 0
+             THEN puzzles_solved::DOUBLE / puzzles_attempted ELSE 0 END AS solve_rate,
+        CASE WHEN total_guesses > 0
+             THEN correct_guesses::DOUBLE / total_guesses ELSE 0 END AS guess_accuracy,
+        -- Average one-shot score per puzzle (NULL for classic runs)
+        CASE WHEN mode = 'oneshot' AND puzzles_attempted > 0
+             THEN total_score::DOUBLE / puzzles_attempted END AS avg_score,
+        -- Average time per puzzle (wall clock)
+        CASE WHEN puzzles_attempted > 0
+             THEN total_time_sec / puzzles_attempted ELSE 0.0 END AS avg_time_sec,
+        -- Inference time = wall - backoff. Historical runs with no backoff
+        -- postings have total_backoff_sec = NULL; leave inference fields NULL
+        -- too so downstream reporting can show "—" instead of mis-crediting zero.
+        -- (GREATEST skips NULL arguments, hence the explicit guard.)
+        CASE WHEN total_backoff_sec IS NOT NULL
+             THEN GREATEST(0.0, total_time_sec - total_backoff_sec) END AS total_inference_sec,
+        CASE WHEN total_backoff_sec IS NOT NULL THEN
+            CASE WHEN puzzles_attempted > 0
+                 THEN GREATEST(0.0, total_time_sec - total_backoff_sec) / puzzles_attempted
+                 ELSE 0.0 END
+        END AS avg_inference_sec
+    FROM run_totals
+    """
     
-    print(f"\nExtracted {len(summaries)} run summaries total")
-    return summaries
+    print("Querying controllog.events and controllog.postings...")
+    (count,) = con.execute(f"CREATE OR REPLACE TEMP TABLE run_summaries AS {query}").fetchone()
 
+    # One line for the whole batch; a line per run adds up once there are
+    # thousands of runs and stdout goes to a slow CI log.
+    print(f"\nExtracted {count} run summaries total")
+    return count
 
-def summaries_to_csv(summaries: List[Dict[str, Any]], output_file: str = "results/run_summaries.csv"):
-    """Convert run summaries to CSV format."""
-    if not summaries:
-        print("No summaries to write")
-        return
-    
+
+def summaries_to_csv(con: duckdb.DuckDBPyConnection, output_file: str = "results/run_summaries.csv"):
+    """Write the ``run_summaries`` temp table to CSV.
+
+    DuckDB's own CSV writer does the work, so rows never become Python objects.
+    """
     # Create output directory if it doesn't exist
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Define the columns we want in the CSV (in order)
-    columns = [
-        "log_file",
-        "run_id",
-        "model",
-        "timestamp",
-        "seed",
-        "puzzles_attempted",
-        "puzzles_solved", 
-        "solve_rate",
-        "total_guesses",
-        "correct_guesses",
-        "incorrect_guesses", 
-        "invalid_responses",
-        "guess_accuracy",
-        "mode",
-        "total_score",
-        "total_trap_bonus",
-        "max_score",
-        "avg_score",
-        "trap_scored",
-        "avg_time_sec",
-        "total_time_sec",
-        "avg_inference_sec",
-        "total_inference_sec",
-        "total_backoff_sec",
-        "total_tokens",
-        "total_prompt_tokens",
-        "total_completion_tokens",
-        "token_count_method",
-        "total_cost",
-        "total_upstream_cost",
-        "start_timestamp",
-        "end_timestamp"
-    ]
-    
-    # Calculate derived metrics
-    for summary in summaries:
-        # Calculate solve rate
-        if summary.get("puzzles_attempted", 0) > 0:
-            summary["solve_rate"] = summary.get("puzzles_solved", 0) / summary["puzzles_attempted"]
-        else:
-            summary["solve_rate"] = 0
-            
-        # Calculate guess accuracy  
-        if summary.get("total_guesses", 0) > 0:
-            summary["guess_accuracy"] = summary.get("correct_guesses", 0) / summary["total_guesses"]
-        else:
-            summary["guess_accuracy"] = 0
-        
-        # Average one-shot score per puzzle (None for classic runs)
-        if summary.get("mode") == "oneshot" and summary.get("puzzles_attempted", 0) > 0:
-            summary["avg_score"] = (summary.get("total_score") or 0) / summary["puzzles_attempted"]
-        else:
-            summary["avg_score"] = None
 
-        # Calculate average time per puzzle (wall clock)
-        total_time = summary.get("total_time_sec", 0) or 0
-        puzzles_attempted = summary.get("puzzles_attempted", 0) or 0
-        if puzzles_attempted > 0:
-            summary["avg_time_sec"] = total_time / puzzles_attempted
-        else:
-            summary["avg_time_sec"] = 0.0
+    select_list = ", ".join(f'"{col}"' for col in SUMMARY_COLUMNS)
+    target = str(output_path).replace("'", "''")
+    (count,) = con.execute(f"""
+        COPY (
+            SELECT {select_list}
+            FROM run_summaries
+            ORDER BY start_timestamp DESC
+        ) TO '{target}' (FORMAT CSV, HEADER)
+    """).fetchone()
 
-        # Inference time = wall - backoff. Historical runs with no backoff
-        # postings have total_backoff_sec = NULL; leave inference fields NULL too
-        # so downstream reporting can show "—" instead of mis-crediting zero.
-        total_backoff = summary.get("total_backoff_sec")
-        if total_backoff is None:
-            summary["total_inference_sec"] = None
-            summary["avg_inference_sec"] = None
-        else:
-            total_inference = max(0.0, total_time - total_backoff)
-            summary["total_inference_sec"] = total_inference
-            summary["avg_inference_sec"] = (
-                total_inference / puzzles_attempted if puzzles_attempted > 0 else 0.0
-            )
-    
-    print(f"Writing {len(summaries)} summaries to {output_file}")
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=columns, extrasaction='ignore')
-        writer.writeheader()
-        
-        for summary in summaries:
-            # Fill in missing columns with None/empty values
-            row = {col: summary.get(col, None) for col in columns}
-            writer.writerow(row)
-    
-    print(f"Successfully wrote {output_file}")
+    print(f"Wrote {count} summaries to {output_file}")
+
+
+def summaries_to_parquet(con: duckdb.DuckDBPyConnection, output_file: str = "results/run_summaries.parquet"):
+    """Write the ``run_summaries`` temp table to ZSTD-compressed Parquet.
 
+    Same columns and order as the CSV, with types preserved, for analysis
+    that wants column pruning instead of re-parsing text.
+    """
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    select_list = ", ".join(f'"{col}"' for col in SUMMARY_COLUMNS)
+    target = str(output_path).replace("'", "''")
+    con.execute(f"""
+        COPY (
+            SELECT {select_list}
+            FROM run_summaries
+            ORDER BY start_timestamp DESC
+        ) TO '{target}' (FORMAT PARQUET, COMPRESSION ZSTD)
+    """)
 
-def main():
+    print(f"Wrote {output_file}")
+
+
+def main(write_parquet: bool = False):
     """Main function to extract summaries and create CSV."""
     print("🔍 Extracting run summaries from MotherDuck...")
     
     # Get MotherDuck database connection string from environment
     db = os.environ.get("MOTHERDUCK_DB", "md:")
     
-    # Extract summaries from MotherDuck
-    summaries = extract_run_summaries_from_motherduck(db)
-    
-    if not summaries:
-        print("❌ No run summaries found in MotherDuck")
-        return
-    
-    # Convert to CSV
-    summaries_to_csv(summaries, "results/run_summaries.csv")
-    
-    # Print some basic stats
+    print(f"Connecting to MotherDuck database: {db}")
+    con = duckdb.connect(db, config=duckdb_config())
+    try:
+        # Extract summaries from MotherDuck
+        if not extract_run_summaries_from_motherduck(con):
+            print("❌ No run summaries found in MotherDuck")
+            return
+
+        # Convert to CSV, plus a typed Parquet copy when asked for
+        outputs = ["results/run_summaries.csv"]
+        summaries_to_csv(con, outputs[0])
+        if write_parquet:
+            outputs.append("results/run_summaries.parquet")
+            summaries_to_parquet(con, outputs[1])
+
+        # Basic stats, aggregated over the same temp table in one query.
+        (
+            total_runs, n_models, models, total_puzzles, total_solved,
+            overall_solve_rate, total_cost, total_upstream,
+        ) = con.execute("""
+            SELECT
+                COUNT(*),
+                COUNT(DISTINCT model),
+                LIST(DISTINCT model ORDER BY model),
+                SUM(puzzles_attempted),
+                SUM(puzzles_solved),
+                COALESCE(SUM(puzzles_solved) / NULLIF(SUM(puzzles_attempted), 0), 0),
+                SUM(total_cost),
+                SUM(total_upstream_cost)
+            FROM run_summaries
+        """).fetchone()
+    finally:
+        con.close()
+
     print(f"\n📊 Summary Statistics:")
-    print(f"   Total runs: {len(summaries)}")
-    
-    models = set(s.get("model", "unknown") for s in summaries)
-    print(f"   Models tested: {len(models)}")
-    print(f"   Models: {', '.join(sorted(models))}")
-    
-    total_puzzles = sum(s.get("puzzles_attempted", 0) for s in summaries)
-    total_solved = sum(s.get("puzzles_solved", 0) for s in summaries)
-    overall_solve_rate = total_solved / total_puzzles if total_puzzles > 0 else 0
+    print(f"   Total runs: {total_runs}")
+    print(f"   Models tested: {n_models}")
+    print(f"   Models: {', '.join(models)}")
     
     print(f"   Total puzzles attempted: {total_puzzles}")
     print(f"   Total puzzles solved: {total_solved}")
     print(f"   Overall solve rate: {overall_solve_rate:.1%}")
     
-    total_cost = sum(s.get("total_cost", 0) for s in summaries)
-    total_upstream = sum(s.get("total_upstream_cost", 0) for s in summaries)
     print(f"   Total OpenRouter cost: ${total_cost:.6f}")
     print(f"   Total upstream cost: ${total_upstream:.6f}")
     
-    print(f"\n✅ Results saved to results/run_summaries.csv")
+    print(f"\n✅ Results saved to {' and '.join(outputs)}")
 
 
 if __name__ == "__main__":
-    main()
+    main(write_parquet="--parquet" in sys.argv)
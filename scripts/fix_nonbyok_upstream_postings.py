@@ -15,17 +15,24 @@ Fix: For events that have BOTH vendor:openrouter AND vendor:upstream money
 postings with non-zero amounts, delete the vendor:upstream posting and the
 extra project posting.
 
-Strategy: Rebuild controllog.postings via CTAS, excluding the bad rows.
+Strategy: DELETE the bad rows in place, in one transaction that is rolled
+back if the count is not what the scope report predicted.
 
 Usage:
   uv run python scripts/fix_nonbyok_upstream_postings.py --dry-run
   uv run python scripts/fix_nonbyok_upstream_postings.py
+
+Local DuckDB resources can be tuned through the environment:
+  DUCKDB_THREADS       worker threads (DuckDB defaults to all cores)
+  DUCKDB_MEMORY_LIMIT  e.g. 8GB (DuckDB defaults to 80% of RAM)
 """
 
 import os
 import sys
 import duckdb  # type: ignore
 
+from duckdb_settings import duckdb_config
+
 
 FIND_BAD_EVENTS = """
     SELECT p.event_id
@@ -41,24 +48,30 @@ FIND_BAD_EVENTS = """
                      THEN ABS(p.delta_numeric) ELSE 0 END) > 0
 """
 
+# Affected runs listed from each end of the report before eliding the middle.
+RUNS_SHOWN = 10
+
 
 def fix_upstream_postings(target_db: str, dry_run: bool = False) -> None:
-    con = duckdb.connect(target_db)
+    con = duckdb.connect(target_db, config=duckdb_config())
+
+    # Find the bad events once; every later query reads this temp table
+    # instead of re-running the grouped scan over postings.
+    con.execute(f"CREATE TEMP TABLE bad_events AS {FIND_BAD_EVENTS}")
 
     # --- Report scope ---
-    affected = con.execute(f"""
-        WITH bad AS ({FIND_BAD_EVENTS})
+    affected = con.execute("""
         SELECT
-            COUNT(DISTINCT bad.event_id) AS events,
+            COUNT(*) AS events,
             (SELECT COUNT(*) FROM controllog.postings p
-             WHERE p.event_id IN (SELECT event_id FROM bad)
+             WHERE p.event_id IN (SELECT event_id FROM bad_events)
              AND p.account_type = 'resource.money'
              AND p.account_id = 'vendor:upstream')          AS upstream_postings,
             (SELECT COUNT(*) FROM controllog.postings p
-             WHERE p.event_id IN (SELECT event_id FROM bad)
+             WHERE p.event_id IN (SELECT event_id FROM bad_events)
              AND p.account_type = 'resource.money'
              AND p.account_id LIKE 'project:%')             AS project_postings
-        FROM bad
+        FROM bad_events
     """).fetchone()
 
     n_events, n_upstream, n_project = affected
@@ -69,20 +82,23 @@ def fix_upstream_postings(target_db: str, dry_run: bool = False) -> None:
     print(f"Total postings to remove:  {n_to_delete}")
 
     # Show affected runs
-    runs = con.execute(f"""
-        WITH bad AS ({FIND_BAD_EVENTS})
+    runs = con.execute("""
         SELECT DISTINCT e.run_id,
             SUM(CASE WHEN p.account_id = 'vendor:upstream'
                      THEN ABS(p.delta_numeric) ELSE 0 END) AS bogus_cost
         FROM controllog.events e
         JOIN controllog.postings p ON p.event_id = e.event_id
-        WHERE e.event_id IN (SELECT event_id FROM bad)
+        WHERE e.event_id IN (SELECT event_id FROM bad_events)
         AND p.account_type = 'resource.money'
         GROUP BY e.run_id
         ORDER BY e.run_id
     """).fetchall()
     print(f"\nAffected runs ({len(runs)}):")
-    for run_id, bogus_cost in runs:
+    # Show the ends of a long list rather than one line per run.
+    shown = runs if len(runs) <= 2 * RUNS_SHOWN else runs[:RUNS_SHOWN] + runs[-RUNS_SHOWN:]
+    for i, (run_id, bogus_cost) in enumerate(shown):
+        if i == RUNS_SHOWN and len(shown) < len(runs):
+            print(f"  ... {len(runs) - len(shown)} more ...")
         print(f"  {run_id:50s}  ${bogus_cost:.4f}")
 
     if n_events == 0:
@@ -98,56 +114,61 @@ def fix_upstream_postings(target_db: str, dry_run: bool = False) -> None:
     # --- Total postings before ---
     total_before = con.execute("SELECT COUNT(*) FROM controllog.postings").fetchone()[0]
 
-    # --- Build clean postings table ---
+    # --- Stage postings_to_delete, then delete them in place ---
     # For each affected event, identify the posting_ids to DELETE:
     #   1. All vendor:upstream money postings
     #   2. One of the two duplicate project money postings (the one with the
     #      higher posting_id, to keep the first-created one)
-    con.execute(f"""
-        CREATE TABLE controllog.postings_fixed AS
-        SELECT * FROM controllog.postings
-        WHERE posting_id NOT IN (
-            -- vendor:upstream postings for affected events
-            SELECT p.posting_id
+    con.execute("""
+        CREATE TEMP TABLE postings_to_delete AS
+        -- vendor:upstream postings for affected events
+        SELECT p.posting_id
+        FROM controllog.postings p
+        WHERE p.event_id IN (SELECT event_id FROM bad_events)
+        AND p.account_type = 'resource.money'
+        AND p.account_id = 'vendor:upstream'
+
+        UNION ALL
+
+        -- duplicate project postings: keep rn=1, delete rn=2
+        SELECT posting_id FROM (
+            SELECT p.posting_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY p.event_id
+                    ORDER BY p.posting_id DESC  -- delete the later one
+                ) AS rn
             FROM controllog.postings p
-            WHERE p.event_id IN ({FIND_BAD_EVENTS})
+            WHERE p.event_id IN (SELECT event_id FROM bad_events)
             AND p.account_type = 'resource.money'
-            AND p.account_id = 'vendor:upstream'
-
-            UNION ALL
-
-            -- duplicate project postings: keep rn=1, delete rn=2
-            SELECT posting_id FROM (
-                SELECT p.posting_id,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY p.event_id
-                        ORDER BY p.posting_id DESC  -- delete the later one
-                    ) AS rn
-                FROM controllog.postings p
-                WHERE p.event_id IN ({FIND_BAD_EVENTS})
-                AND p.account_type = 'resource.money'
-                AND p.account_id LIKE 'project:%'
-            )
-            WHERE rn = 1
+            AND p.account_id LIKE 'project:%'
         )
+        WHERE rn = 1
     """)
 
-    total_after = con.execute("SELECT COUNT(*) FROM controllog.postings_fixed").fetchone()[0]
-    removed = total_before - total_after
+    # Delete in place rather than rewriting the whole table for a handful of
+    # rows; the transaction keeps the sanity check below all-or-nothing.
+    # The surviving rows keep the (event_id, posting_id) order that
+    # dedupe_motherduck.py writes, so event_id zone maps stay selective
+    # without re-clustering here.
+    con.execute("BEGIN TRANSACTION")
+    removed = con.execute("""
+        DELETE FROM controllog.postings p
+        USING postings_to_delete d
+        WHERE p.posting_id = d.posting_id
+    """).fetchone()[0]
+    total_after = total_before - removed
 
     print(f"\nPostings: {total_before} -> {total_after} (removed {removed})")
 
     if removed != n_to_delete:
         print(f"WARNING: expected to remove {n_to_delete}, actually removed {removed}")
-        con.execute("DROP TABLE controllog.postings_fixed")
-        print("Aborted. Dropped staging table.")
+        con.execute("ROLLBACK")
+        print("Aborted. Rolled back.")
         con.close()
         return
 
-    # --- Swap ---
-    con.execute("DROP TABLE controllog.postings")
-    con.execute("ALTER TABLE controllog.postings_fixed RENAME TO postings")
-    print("Done. Table swapped successfully.")
+    con.execute("COMMIT")
+    print("Done. Postings deleted successfully.")
 
     # --- Verify: no more dual-vendor events ---
     remaining = con.execute(f"""
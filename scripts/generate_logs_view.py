@@ -16,20 +16,119 @@ This script:
 
 Environment:
 - MOTHERDUCK_DB: MotherDuck database connection string (default: "md:")
+- DUCKDB_THREADS / DUCKDB_MEMORY_LIMIT: optional DuckDB thread count and memory cap (e.g. 8GB)
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
+from operator import attrgetter
 from pathlib import Path
 import re
 import duckdb  # type: ignore
 
+from duckdb_settings import duckdb_config
+
 
 DOCS_LOG_DIR = Path("docs/logs")
 RUN_SUMMARIES_CSV = Path("results/run_summaries.csv")
 
+# Token/cost summary for an event with no resource postings.
+NO_TOKENS: Dict[str, Any] = {"prompt_tokens": 0, "completion_tokens": 0, "cost": None}
+
+# Per-event token and cost totals, summed in DuckDB rather than by walking
+# every posting in Python. Only the project: side of token postings is counted
+# (positive delta; provider: is the negative mirror), and cost is the vendor:
+# side (negative delta, money leaving) taken as a magnitude. Postings repeated
+# under the same posting_id are counted once (see dedupe_motherduck.py).
+EVENT_TOKENS_QUERY = """
+WITH token_postings AS (
+    SELECT event_id, account_type, unit, delta_numeric, dims_json
+    FROM controllog.postings
+    WHERE account_type IN ('resource.tokens', 'resource.money')
+    AND event_id IN (SELECT event_id FROM controllog.events WHERE run_id = ANY(?))
+    QUALIFY row_number() OVER (PARTITION BY posting_id) = 1
+)
+SELECT
+    event_id,
+    CAST(SUM(trunc(delta_numeric)) FILTER (
+        WHERE account_type = 'resource.tokens' AND unit = '+tokens'
+        AND delta_numeric > 0 AND lower(dims_json.phase) = 'prompt') AS BIGINT) AS prompt_tokens,
+    CAST(SUM(trunc(delta_numeric)) FILTER (
+        WHERE account_type = 'resource.tokens' AND unit = '+tokens'
+        AND delta_numeric > 0 AND lower(dims_json.phase) = 'completion') AS BIGINT) AS completion_tokens,
+    SUM(-delta_numeric) FILTER (
+        WHERE account_type = 'resource.money' AND unit = '$' AND delta_numeric < 0) AS cost
+FROM token_postings
+GROUP BY event_id
+"""
+
+# Model and provider shown in each run's header: the earliest non-empty value
+# of each in the run's event payloads.
+RUN_MODEL_QUERY = """
+SELECT
+    run_id,
+    arg_min(payload_json.model, event_time) FILTER (WHERE payload_json.model <> '') AS model,
+    arg_min(payload_json.provider, event_time) FILTER (WHERE payload_json.provider <> '') AS provider
+FROM controllog.events
+WHERE run_id = ANY(?)
+GROUP BY run_id
+"""
+
+# Per-puzzle totals for the stats lines and the puzzle ordering, keyed by
+# (run_id, puzzle_id). Tokens and cost come from model_prompt,
+# model_completion and model_response events. A graded attempt is any
+# completion/response whose verdict is not INVALID_RESPONSE; a missing verdict
+# still counts, as it always has. Correct groups come from the one-shot
+# GROUPS_n field (legacy ONESHOT_SCORE_n verdicts imply min(n, 4)), otherwise
+# one per CORRECT (but not INCORRECT) verdict. Rows repeated under the same
+# event_id are dropped first, keeping the same row the loader keeps, so they
+# are neither counted twice nor joined to their tokens twice.
+PUZZLE_STATS_QUERY = f"""
+WITH event_tokens AS ({EVENT_TOKENS_QUERY}),
+run_events AS (
+    SELECT event_id, run_id, kind, payload_json
+    FROM controllog.events
+    WHERE run_id = ANY(?)
+    QUALIFY row_number() OVER (PARTITION BY event_id ORDER BY run_id, event_time) = 1
+),
+puzzle_events AS (
+    SELECT
+        event_id,
+        run_id,
+        CAST(payload_json.puzzle_id AS VARCHAR) AS puzzle_id,
+        kind,
+        upper(COALESCE(payload_json.result, 'None')) AS result
+    FROM run_events
+    WHERE kind IN ('model_prompt', 'model_completion', 'model_response')
+    AND payload_json.puzzle_id IS NOT NULL
+)
+SELECT
+    pe.run_id,
+    pe.puzzle_id,
+    COALESCE(SUM(et.prompt_tokens), 0) AS prompt,
+    COALESCE(SUM(et.completion_tokens), 0) AS completion,
+    COALESCE(SUM(et.cost), 0.0) AS cost,
+    COUNT(*) FILTER (
+        WHERE pe.kind <> 'model_prompt'
+        AND pe.result <> '' AND NOT contains(pe.result, 'INVALID_RESPONSE')) AS guesses,
+    COALESCE(SUM(CASE
+        WHEN pe.kind = 'model_prompt' THEN 0
+        WHEN starts_with(pe.result, 'ONESHOT_SCORE_') THEN COALESCE(
+            TRY_CAST(NULLIF(regexp_extract(pe.result, 'GROUPS_(\\d+)', 1), '') AS BIGINT),
+            LEAST(COALESCE(TRY_CAST(split_part(pe.result[15:], '_', 1) AS BIGINT), 0), 4),
+            0)
+        WHEN contains(pe.result, 'CORRECT') AND NOT contains(pe.result, 'INCORRECT') THEN 1
+        ELSE 0
+    END), 0) AS correct
+FROM puzzle_events pe
+LEFT JOIN event_tokens et USING (event_id)
+GROUP BY pe.run_id, pe.puzzle_id
+"""
+
 
 @dataclass
 class Posting:
@@ -46,22 +145,25 @@ class Event:
     event_time: str
     kind: str
     run_id: str
+    actor_task_id: Optional[str]
     payload: Dict[str, Any]
-    raw: Dict[str, Any]
+    # Parsed once at load; events are sorted on it more than once.
+    dt: datetime
     postings: List[Posting] = field(default_factory=list)
+    tokens: Dict[str, Any] = field(default_factory=lambda: dict(NO_TOKENS))
 
-    @property
-    def dt(self) -> datetime:
-        try:
-            return datetime.fromisoformat(self.raw.get("event_time").replace("Z", "+00:00"))
-        except Exception:
-            return datetime.min
+
+def parse_event_time(event_time: str) -> datetime:
+    try:
+        return datetime.fromisoformat(event_time.replace("Z", "+00:00"))
+    except Exception:
+        return datetime.min
 
 
 def struct_to_dict(struct_value: Any) -> Dict[str, Any]:
     """Convert a DuckDB STRUCT to a Python dict.
     
-    DuckDB STRUCTs are already returned as dicts when using .df(),
+    DuckDB STRUCTs are already returned as dicts by fetchall(),
     but we handle None and ensure it's a dict.
     """
     if struct_value is None:
@@ -75,148 +177,177 @@ def struct_to_dict(struct_value: Any) -> Dict[str, Any]:
         return {}
 
 
-def load_events_and_postings(db: str = "md:") -> Dict[str, Event]:
-    """Load events and postings from MotherDuck controllog tables."""
-    event_by_id: Dict[str, Event] = {}
-    
+@lru_cache(maxsize=1)
+def get_connection(db: str) -> Any:
+    """Open (once per database) the connection the loader queries through.
+
+    Cached so that calling the loader again in the same process, e.g. from a
+    driver script or a notebook, reuses the MotherDuck session instead of
+    authenticating again.
+    """
     print(f"Connecting to MotherDuck database: {db}")
-    con = duckdb.connect(db)
-    
+    return duckdb.connect(db, config=duckdb_config())
+
+
+def fetch_all(cursor: Any, query: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+    """Run one query on its own cursor and return plain tuples.
+
+    fetchall() is used rather than .df(): every row is turned into dataclasses
+    straight away, so a pandas frame would only add a conversion step.
+    """
     try:
-        # Query all events
-        print("  Loading events...")
-        events_query = """
-        SELECT 
-            event_id,
-            event_time,
-            kind,
-            actor_agent_id,
-            actor_task_id,
-            project_id,
-            run_id,
-            source,
-            idempotency_key,
-            payload_json
-        FROM controllog.events
-        ORDER BY event_time
-        """
-        events_df = con.execute(events_query).df()
-        
-        # Convert events to Event objects
-        for _, row in events_df.iterrows():
-            # Convert payload_json STRUCT to dict
-            payload = struct_to_dict(row.get("payload_json"))
-            
-            # Build raw record (all fields)
-            raw_rec = {
-                "event_id": str(row.get("event_id", "")),
-                "event_time": str(row.get("event_time", "")),
-                "ingest_time": "",
-                "kind": str(row.get("kind", "")),
-                "actor_agent_id": str(row.get("actor_agent_id", "")) if row.get("actor_agent_id") else None,
-                "actor_task_id": str(row.get("actor_task_id", "")) if row.get("actor_task_id") else None,
-                "project_id": str(row.get("project_id", "")),
-                "run_id": str(row.get("run_id", "")) if row.get("run_id") else None,
-                "source": str(row.get("source", "")),
-                "idempotency_key": str(row.get("idempotency_key", "")),
-                "payload_json": payload,
-            }
-            
-            ev = Event(
-                event_id=raw_rec.get("event_id"),
-                event_time=raw_rec.get("event_time"),
-                kind=raw_rec.get("kind"),
-                run_id=raw_rec.get("run_id"),
-                payload=payload,
-                raw=raw_rec,
-            )
-            if ev.event_id:
-                event_by_id[ev.event_id] = ev
-        
-        print(f"  Loaded {len(event_by_id)} events")
-        
-        # Query all postings
-        print("  Loading postings...")
-        postings_query = """
-        SELECT 
-            posting_id,
-            event_id,
-            account_type,
-            account_id,
-            unit,
-            delta_numeric,
-            dims_json
-        FROM controllog.postings
-        """
-        postings_df = con.execute(postings_query).df()
-        
-        # Attach postings to events
-        posting_count = 0
-        for _, row in postings_df.iterrows():
-            eid = str(row.get("event_id", ""))
-            if not eid:
-                continue
-            ev = event_by_id.get(eid)
-            if not ev:
-                # Postings might reference events that don't exist; skip if missing
-                continue
-            
-            # Convert dims_json STRUCT to dict
-            dims = struct_to_dict(row.get("dims_json"))
-            
-            ev.postings.append(
-                Posting(
-                    event_id=eid,
-                    account_type=str(row.get("account_type", "")),
-                    unit=str(row.get("unit", "")),
-                    delta=float(row.get("delta_numeric", 0)),
-                    dims=dims,
-                )
-            )
-            posting_count += 1
-        
-        print(f"  Loaded {posting_count} postings")
-        
+        return cursor.execute(query, params).fetchall()
     finally:
-        con.close()
-    
-    return event_by_id
+        cursor.close()
+
 
+def load_events_and_postings(
+    db: str, run_ids: List[str]
+) -> Tuple[Dict[str, List[Event]], Dict[str, Dict[str, Dict[str, Any]]], Dict[str, Tuple[Optional[str], Optional[str]]]]:
+    """Load events, postings and per-run/per-puzzle summaries for the given
+    runs from MotherDuck controllog tables.
 
-def group_by_run(event_by_id: Dict[str, Event]) -> Dict[str, List[Event]]:
+    Returns (runs, puzzle_stats_by_run, model_by_run). runs maps run_id to its
+    events in time order; puzzle_stats_by_run is keyed by run_id and then
+    str(puzzle_id); model_by_run maps run_id to (model, provider). The run
+    filter is applied in the queries so only the rows that will be rendered
+    leave the database.
+    """
+    event_by_id: Dict[str, Event] = {}
     runs: Dict[str, List[Event]] = {}
-    for ev in event_by_id.values():
-        if not ev.run_id:
-            continue
-        runs.setdefault(ev.run_id, []).append(ev)
-    for run_id, evs in runs.items():
-        evs.sort(key=lambda e: e.dt)
-    return runs
-
-
-def summarize_tokens_and_cost(postings: List[Posting]) -> Dict[str, Any]:
-    prompt_tokens = 0
-    completion_tokens = 0
-    money = 0.0
-    for p in postings:
-        if p.account_type == "resource.tokens" and p.unit == "+tokens" and p.delta > 0:
-            # Only count project: side (positive delta); provider: side is negative mirror
-            phase = str(p.dims.get("phase", "")).lower()
-            if phase == "prompt":
-                prompt_tokens += int(p.delta)
-            elif phase == "completion":
-                completion_tokens += int(p.delta)
-        if p.account_type == "resource.money" and p.unit == "$" and p.delta < 0:
-            # Cost postings: vendor: side is negative (money leaving); take abs
-            money += abs(float(p.delta))
-    return {
-        "prompt_tokens": prompt_tokens,
-        "completion_tokens": completion_tokens,
-        "cost": money if money > 0 else None,
+    puzzle_stats_by_run: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    model_by_run: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    
+    con = get_connection(db)
+    
+    events_query = """
+    SELECT 
+        event_id,
+        event_time,
+        kind,
+        actor_task_id,
+        run_id,
+        payload_json
+    FROM controllog.events
+    WHERE run_id = ANY(?)
+    ORDER BY run_id, event_time
+    """
+    # State transitions are the only postings still read row by row
+    postings_query = """
+    SELECT 
+        event_id,
+        account_type,
+        unit,
+        delta_numeric,
+        dims_json
+    FROM controllog.postings
+    WHERE account_type = 'truth.state'
+    AND event_id IN (SELECT event_id FROM controllog.events WHERE run_id = ANY(?))
+    """
+    
+    # The queries are independent, so each runs on its own cursor (a cheap
+    # extra connection to the same database) in a thread. Against MotherDuck
+    # this overlaps the round trips instead of paying for them one by one.
+    print("  Querying events, postings and summaries...")
+    queries = {
+        "events": (events_query, [run_ids]),
+        "tokens": (EVENT_TOKENS_QUERY, [run_ids]),
+        "models": (RUN_MODEL_QUERY, [run_ids]),
+        "puzzles": (PUZZLE_STATS_QUERY, [run_ids, run_ids]),
+        "states": (postings_query, [run_ids]),
     }
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = {
+            name: pool.submit(fetch_all, con.cursor(), query, params)
+            for name, (query, params) in queries.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    
+    # Convert events to Event objects. Rows arrive sorted by run and time,
+    # so appending groups them into runs with no Python-side sort.
+    for event_id, event_time, kind, actor_task_id, run_id, payload_json in results["events"]:
+        # Only the fields the renderer reads are kept. event_id may come back
+        # as a UUID and event_time as a TIMESTAMP on older tables, so those
+        # two are normalized to str.
+        event_time = str(event_time)
+        ev = Event(
+            event_id=str(event_id),
+            event_time=event_time,
+            kind=kind,
+            run_id=run_id,
+            actor_task_id=actor_task_id,
+            payload=struct_to_dict(payload_json),
+            dt=parse_event_time(event_time),
+        )
+        # Skip rows repeated under the same event_id (see dedupe_motherduck.py)
+        if ev.event_id not in event_by_id:
+            event_by_id[ev.event_id] = ev
+            runs.setdefault(run_id, []).append(ev)
+    
+    print(f"  Loaded {len(event_by_id)} events")
+    
+    # Token and cost totals per event
+    token_count = 0
+    for event_id, prompt_tokens, completion_tokens, cost in results["tokens"]:
+        ev = event_by_id.get(str(event_id))
+        if not ev:
+            continue
+        ev.tokens = {
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "cost": cost if cost and cost > 0 else None,
+        }
+        token_count += 1
+    print(f"  Summed postings for {token_count} events")
+    
+    # Run header labels
+    for run_id, model, provider in results["models"]:
+        model_by_run[run_id] = (model, provider)
+    
+    # Per-puzzle rollup
+    for run_id, puzzle_id, prompt, completion, cost, guesses, correct in results["puzzles"]:
+        puzzle_stats_by_run.setdefault(run_id, {})[puzzle_id] = {
+            "prompt": prompt,
+            "completion": completion,
+            "cost": cost,
+            "guesses": guesses,
+            "correct": correct,
+        }
+    
+    # Attach state postings to events
+    posting_count = 0
+    for event_id, account_type, unit, delta_numeric, dims_json in results["states"]:
+        eid = str(event_id)
+        if not eid:
+            continue
+        ev = event_by_id.get(eid)
+        if not ev:
+            # Postings might reference events that don't exist; skip if missing
+            continue
+        
+        # Convert dims_json STRUCT to dict
+        dims = struct_to_dict(dims_json)
+        
+        ev.postings.append(
+            Posting(
+                event_id=eid,
+                account_type=str(account_type),
+                unit=str(unit),
+                delta=float(delta_numeric or 0),
+                dims=dims,
+            )
+        )
+        posting_count += 1
+    
+    print(f"  Loaded {posting_count} state postings")
+    
+    return runs, puzzle_stats_by_run, model_by_run
 
 
 def escape_html(text: Optional[str]) -> str:
+    # Only for text that can carry markup (prompts, responses, verdicts, ids
+    # from the data). Timestamps, guess indexes and the numeric stats lines we
+    # format ourselves are interpolated as-is.
     if text is None:
         return ""
     return (
@@ -249,7 +380,7 @@ def extract_state_transition(ev: Event) -> Optional[Tuple[str, str, str, Optiona
     p = ev.payload or {}
     if "puzzle_id" in p:
         pid_str = str(p.get("puzzle_id"))
-    acc = ev.raw.get("actor_task_id") or ev.raw.get("actor", {}).get("task_id") or ""
+    acc = ev.actor_task_id or ""
     from_val: Optional[str] = None
     to_val: Optional[str] = None
     for p in ev.postings:
@@ -285,9 +416,11 @@ def split_thinking_blocks(text: str) -> Tuple[str, str]:
     """
     if not text:
         return "", ""
+    # str.find is a C-level substring search; the closing tag is only looked
+    # for after the opening one, so each character is scanned at most once.
     start = text.find("<thinking>")
-    end = text.find("</thinking>")
-    if start != -1 and end != -1 and end > start:
+    end = text.find("</thinking>", start + len("<thinking>")) if start != -1 else -1
+    if end != -1:
         thinking = text[start + len("<thinking>"):end].strip()
         rest = (text[:start] + text[end + len("</thinking>"):]).strip()
         rest = _STRAY_TAIL_RE.sub("", rest)
@@ -301,9 +434,6 @@ def split_thinking_blocks(text: str) -> Tuple[str, str]:
     return "", _STRAY_TAIL_RE.sub("", text.strip())
 
 
-_GUESS_RE = re.compile(r"<guess>\s*(.+?)\s*</guess>", re.DOTALL)
-
-
 def extract_guess_words(text: str) -> Optional[List[str]]:
     """Best-effort parse of guessed words from response text.
 
@@ -311,77 +441,86 @@ def extract_guess_words(text: str) -> Optional[List[str]]:
     """
     if not text:
         return None
-    m = _GUESS_RE.search(text)
-    if not m:
+    # Plain substring search: skips straight to the tag even after a long
+    # thinking preamble, and costs one scan when there is no guess at all.
+    start = text.find("<guess>")
+    if start == -1:
         return None
-    payload = m.group(1)
+    end = text.find("</guess>", start + len("<guess>"))
+    if end == -1:
+        return None
+    payload = text[start + len("<guess>"):end]
     words = [w.strip() for w in payload.split(',') if w.strip()]
     return words[:4] if words else None
 
 
-def render_run_html(run_id: str, events: List[Event]) -> str:
-    # Basic CSS for chat layout
-    css = (
-        "body{font-family:ui-monospace,Menlo,Consolas,Monaco,\"Courier New\",monospace;margin:0;padding:0;"
-        "background:repeating-linear-gradient(0deg,#e9ecef,#e9ecef 24px,#eff2f5 25px);color:#0f1419;}"
-        ".container{max-width:1024px;margin:0 auto;padding:24px;}"
-        ".panel{background:#ffffff;border:2px solid #2b3035;box-shadow:inset 0 0 0 1px #d9dde1;}") + (
-        ".topbar{display:flex;justify-content:space-between;align-items:center;padding:10px 14px;"
-        "background:#1f2a36;color:#e6eef7;border-bottom:2px solid #2b3035;letter-spacing:0.04em;text-transform:uppercase;}"
-        ".title{font-weight:700;} .meta{color:#8aa0b8;font-size:12px;}"
-        ".content{padding:16px;}"
-        ".row{display:flex;flex-direction:column;margin:8px 0;}"
-        ".bubble{max-width:76%;padding:0;border:2px solid #2b3035;background:#fff;}") + (
-        ".bubble .metahead{background:#f2f5f8;border-bottom:2px solid #2b3035;padding:6px 10px;"
-        "font-size:11px;text-transform:uppercase;letter-spacing:0.04em;color:#28323b;display:flex;justify-content:space-between;}"
-        ".bubble .body{padding:12px 14px;white-space:pre-wrap;word-wrap:break-word;}"
-        ".left{align-self:flex-start;border-left:6px solid #6c757d;}"
-        ".right{align-self:flex-end;border-left:6px solid #0d6efd;background:#f7fbff;}"
-        ".step{border-left:4px solid #2b3035;padding-left:12px;margin:18px 0;}"
-        ".state{font-size:12px;color:#34424f;margin-left:2px;margin-top:6px;}"
-        ".stats{font-size:12px;color:#1f2a36;margin-top:6px;}"
-        ".pill{display:inline-block;background:#f0f3f6;border:2px solid #2b3035;border-radius:0;padding:2px 8px;margin-right:6px;color:#1f2a36;}"
-        ".endpill{display:inline-block;background:#e7f5ec;border:2px solid #2b3035;color:#1f3b2a;border-radius:0;padding:4px 10px;margin:10px 0;}") + (
-        "details{margin:8px 0;} details>summary{cursor:pointer;color:#0b63ce;list-style:none;display:flex;align-items:center;}"
-        "details>summary::before{content:'\\25B8';font-size:14px;margin-right:6px;flex-shrink:0;transition:transform 0.15s;line-height:1;}"
-        "details[open]>summary::before{transform:rotate(90deg);}"
-        ".thinking{font-style:italic;font-size:12px;color:#2b333b;white-space:pre-wrap;overflow-x:auto;}"
-        ".bubble .body{overflow:hidden;}"
-        ".bubble details{margin:4px 0;}"
-        ".footer{margin:24px;color:#48525c;font-size:12px;}"
-        "a{color:#0b63ce;text-decoration:none;}a:hover{text-decoration:underline;}"
-        ".puzzle-block{border:2px solid #2b3035;margin:10px 0;background:#fff;}"
-        ".puzzle-block>summary{cursor:pointer;padding:10px 14px;display:flex;align-items:center;gap:10px;"
-        "background:#f2f5f8;border-bottom:2px solid #2b3035;list-style:none;font-size:13px;}"
-        ".puzzle-block>summary::before{content:'\\25B8';font-size:16px;flex-shrink:0;line-height:1;transition:transform 0.15s;}"
-        ".puzzle-block[open]>summary::before{transform:rotate(90deg);}"
-        ".puzzle-block>summary .puzzle-stats-inline{color:#48525c;font-size:12px;margin-left:auto;text-align:right;white-space:nowrap;}"
-        ".puzzle-failed>summary{background:#fff3f3;}"
-        ".puzzle-failed>summary .pill{border-color:#c0392b;color:#c0392b;}"
-        ".puzzle-solved>summary{background:#eaf6ee;}"
-        ".puzzle-solved>summary .pill{border-color:#1f3b2a;color:#1f3b2a;}"
-        ".bubble.error{border-left-color:#c0392b;background:#fff5f5;}"
-        ".bubble.error .metahead{background:#ffe5e5;color:#7a1f1f;}"
-        ".endpill.failed{background:#fde7e9;color:#5b1a1f;}"
-    )
-
-    # Determine model/provider from first event with payload
-    model = None
-    provider = None
-    for ev in events:
-        model = model or ev.payload.get("model")
-        provider = provider or ev.payload.get("provider")
-        if model and provider:
-            break
-
+# Basic CSS for chat layout, shared by every run page
+RUN_PAGE_CSS = (
+    "body{font-family:ui-monospace,Menlo,Consolas,Monaco,\"Courier New\",monospace;margin:0;padding:0;"
+    "background:repeating-linear-gradient(0deg,#e9ecef,#e9ecef 24px,#eff2f5 25px);color:#0f1419;}"
+    ".container{max-width:1024px;margin:0 auto;padding:24px;}"
+    ".panel{background:#ffffff;border:2px solid #2b3035;box-shadow:inset 0 0 0 1px #d9dde1;}"
+    ".topbar{display:flex;justify-content:space-between;align-items:center;padding:10px 14px;"
+    "background:#1f2a36;color:#e6eef7;border-bottom:2px solid #2b3035;letter-spacing:0.04em;text-transform:uppercase;}"
+    ".title{font-weight:700;} .meta{color:#8aa0b8;font-size:12px;}"
+    ".content{padding:16px;}"
+    ".row{display:flex;flex-direction:column;margin:8px 0;}"
+    ".bubble{max-width:76%;padding:0;border:2px solid #2b3035;background:#fff;}"
+    ".bubble .metahead{background:#f2f5f8;border-bottom:2px solid #2b3035;padding:6px 10px;"
+    "font-size:11px;text-transform:uppercase;letter-spacing:0.04em;color:#28323b;display:flex;justify-content:space-between;}"
+    ".bubble .body{padding:12px 14px;white-space:pre-wrap;word-wrap:break-word;}"
+    ".left{align-self:flex-start;border-left:6px solid #6c757d;}"
+    ".right{align-self:flex-end;border-left:6px solid #0d6efd;background:#f7fbff;}"
+    ".step{border-left:4px solid #2b3035;padding-left:12px;margin:18px 0;}"
+    ".state{font-size:12px;color:#34424f;margin-left:2px;margin-top:6px;}"
+    ".stats{font-size:12px;color:#1f2a36;margin-top:6px;}"
+    ".pill{display:inline-block;background:#f0f3f6;border:2px solid #2b3035;border-radius:0;padding:2px 8px;margin-right:6px;color:#1f2a36;}"
+    ".endpill{display:inline-block;background:#e7f5ec;border:2px solid #2b3035;color:#1f3b2a;border-radius:0;padding:4px 10px;margin:10px 0;}"
+    "details{margin:8px 0;} details>summary{cursor:pointer;color:#0b63ce;list-style:none;display:flex;align-items:center;}"
+    "details>summary::before{content:'\\25B8';font-size:14px;margin-right:6px;flex-shrink:0;transition:transform 0.15s;line-height:1;}"
+    "details[open]>summary::before{transform:rotate(90deg);}"
+    ".thinking{font-style:italic;font-size:12px;color:#2b333b;white-space:pre-wrap;overflow-x:auto;}"
+    ".bubble .body{overflow:hidden;}"
+    ".bubble details{margin:4px 0;}"
+    ".footer{margin:24px;color:#48525c;font-size:12px;}"
+    "a{color:#0b63ce;text-decoration:none;}a:hover{text-decoration:underline;}"
+    ".puzzle-block{border:2px solid #2b3035;margin:10px 0;background:#fff;}"
+    ".puzzle-block>summary{cursor:pointer;padding:10px 14px;display:flex;align-items:center;gap:10px;"
+    "background:#f2f5f8;border-bottom:2px solid #2b3035;list-style:none;font-size:13px;}"
+    ".puzzle-block>summary::before{content:'\\25B8';font-size:16px;flex-shrink:0;line-height:1;transition:transform 0.15s;}"
+    ".puzzle-block[open]>summary::before{transform:rotate(90deg);}"
+    ".puzzle-block>summary .puzzle-stats-inline{color:#48525c;font-size:12px;margin-left:auto;text-align:right;white-space:nowrap;}"
+    ".puzzle-failed>summary{background:#fff3f3;}"
+    ".puzzle-failed>summary .pill{border-color:#c0392b;color:#c0392b;}"
+    ".puzzle-solved>summary{background:#eaf6ee;}"
+    ".puzzle-solved>summary .pill{border-color:#1f3b2a;color:#1f3b2a;}"
+    ".bubble.error{border-left-color:#c0392b;background:#fff5f5;}"
+    ".bubble.error .metahead{background:#ffe5e5;color:#7a1f1f;}"
+    ".endpill.failed{background:#fde7e9;color:#5b1a1f;}"
+)
+
+
+def render_run_html(
+    run_id: str,
+    events: List[Event],
+    puzzle_stats: Dict[str, Dict[str, Any]],
+    model: Optional[str],
+    provider: Optional[str],
+) -> List[str]:
+    """Render a run page as a list of HTML fragments for write_run_page.
+
+    puzzle_stats maps str(puzzle_id) to that puzzle's PUZZLE_STATS_QUERY totals;
+    model and provider label the header (see RUN_MODEL_QUERY).
+    """
     # Build steps grouped by puzzle_id, then ordered by timestamp within each puzzle.
     # This keeps each puzzle's conversation as a coherent block even for parallel runs.
     steps: List[Dict[str, Any]] = []
     state_increments = 0
     # Track last evaluation per puzzle (to show why a puzzle ended)
     last_eval_by_puzzle: Dict[str, Dict[str, Any]] = {}
-    # Accumulate per-puzzle stats
-    puzzle_stats: Dict[str, Dict[str, Any]] = {}
+    # Time of each puzzle's first prompt/completion/response. A state move only
+    # carries a stats summary once its puzzle has started (so NEW → WIP doesn't).
+    puzzle_started: Dict[str, datetime] = {}
 
     # Pre-group events by puzzle_id; events without a puzzle_id go into a separate list
     puzzle_events: Dict[Any, List[Event]] = {}
@@ -405,7 +544,7 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
 
     # Process each puzzle as a coherent block
     for puzzle_id in sorted_puzzle_ids:
-        p_events = sorted(puzzle_events[puzzle_id], key=lambda e: e.dt)
+        p_events = sorted(puzzle_events[puzzle_id], key=attrgetter("dt"))
         steps.append({"type": "puzzle_header", "puzzle_id": puzzle_id})
         # Track whether a terminal state transition (WIP→DONE/FAILED/ERROR) was emitted
         # so we can synthesize one for older runs that only logged model_response_error.
@@ -420,16 +559,10 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                 steps.append({
                     "type": "prompt",
                     "text": p.get("request_text", ""),
-                    "tokens": summarize_tokens_and_cost(ev.postings),
+                    "tokens": ev.tokens,
                     "ts": ev.event_time,
                 })
-                ps = puzzle_stats.setdefault(pid, {"prompt": 0, "completion": 0, "cost": 0.0, "guesses": 0, "correct": 0, "start_dt": None})
-                tok = summarize_tokens_and_cost(ev.postings)
-                ps["prompt"] += int(tok.get("prompt_tokens") or 0)
-                ps["completion"] += int(tok.get("completion_tokens") or 0)
-                ps["cost"] += float(tok.get("cost") or 0.0)
-                if ps["start_dt"] is None:
-                    ps["start_dt"] = ev.dt
+                puzzle_started.setdefault(pid, ev.dt)
             elif kind == "model_completion":
                 steps.append({
                     "type": "response",
@@ -437,38 +570,10 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                     "result": p.get("result"),
                     "wall_ms": p.get("wall_ms"),
                     "puzzle_id": puzzle_id,
-                    "tokens": summarize_tokens_and_cost(ev.postings),
+                    "tokens": ev.tokens,
                     "ts": ev.event_time,
                 })
-                ps = puzzle_stats.setdefault(pid, {"prompt": 0, "completion": 0, "cost": 0.0, "guesses": 0, "correct": 0, "start_dt": None})
-                tok = summarize_tokens_and_cost(ev.postings)
-                ps["prompt"] += int(tok.get("prompt_tokens") or 0)
-                ps["completion"] += int(tok.get("completion_tokens") or 0)
-                ps["cost"] += float(tok.get("cost") or 0.0)
-                # One model_completion event = one graded attempt by the harness.
-                # Exclude INVALID_RESPONSE (parse failure) from the guess count, but include
-                # all real verdicts even when the renderer's own regex can't re-extract guess
-                # words from quirky model output.
-                res = str(p.get("result", ""))
-                res_u = res.upper()
-                if res and "INVALID_RESPONSE" not in res_u:
-                    ps["guesses"] += 1
-                if res_u.startswith("ONESHOT_SCORE_"):
-                    # One-shot verdict. Trap-scoring format ONESHOT_SCORE_S_GROUPS_G_TRAP_T
-                    # carries groups matched as G; legacy bare ONESHOT_SCORE_N implies
-                    # groups = min(N, 4).
-                    m = re.search(r"GROUPS_(\d+)", res_u)
-                    try:
-                        if m:
-                            ps["correct"] += int(m.group(1))
-                        else:
-                            ps["correct"] += min(int(res_u.split("ONESHOT_SCORE_")[1].split("_")[0]), 4)
-                    except (ValueError, IndexError):
-                        pass
-                elif "CORRECT" in res_u and "INCORRECT" not in res_u:
-                    ps["correct"] += 1
-                if ps["start_dt"] is None:
-                    ps["start_dt"] = ev.dt
+                puzzle_started.setdefault(pid, ev.dt)
             elif kind == "model_response":
                 eval_info = {
                     "guess_index": guess_index,
@@ -477,40 +582,14 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                     "ts": ev.event_time,
                 }
                 last_eval_by_puzzle[pid] = eval_info
-                ps = puzzle_stats.setdefault(pid, {"prompt": 0, "completion": 0, "cost": 0.0, "guesses": 0, "correct": 0, "start_dt": None})
-                tok = summarize_tokens_and_cost(ev.postings)
-                ps["prompt"] += int(tok.get("prompt_tokens") or 0)
-                ps["completion"] += int(tok.get("completion_tokens") or 0)
-                ps["cost"] += float(tok.get("cost") or 0.0)
-                # Match model_completion semantics — count graded attempts by verdict, not
-                # by re-parsing response text, and exclude INVALID_RESPONSE from the guess count.
-                res = str(p.get("result", ""))
-                res_u = res.upper()
-                if res and "INVALID_RESPONSE" not in res_u:
-                    ps["guesses"] += 1
-                if res_u.startswith("ONESHOT_SCORE_"):
-                    # One-shot verdict. Trap-scoring format ONESHOT_SCORE_S_GROUPS_G_TRAP_T
-                    # carries groups matched as G; legacy bare ONESHOT_SCORE_N implies
-                    # groups = min(N, 4).
-                    m = re.search(r"GROUPS_(\d+)", res_u)
-                    try:
-                        if m:
-                            ps["correct"] += int(m.group(1))
-                        else:
-                            ps["correct"] += min(int(res_u.split("ONESHOT_SCORE_")[1].split("_")[0]), 4)
-                    except (ValueError, IndexError):
-                        pass
-                elif "CORRECT" in res_u and "INCORRECT" not in res_u:
-                    ps["correct"] += 1
-                if ps["start_dt"] is None:
-                    ps["start_dt"] = ev.dt
+                puzzle_started.setdefault(pid, ev.dt)
                 steps.append({
                     "type": "response",
                     "text": p.get("response_text") or p.get("result", ""),
                     "result": p.get("result"),
                     "guess_index": guess_index,
                     "puzzle_id": puzzle_id,
-                    "tokens": summarize_tokens_and_cost(ev.postings),
+                    "tokens": ev.tokens,
                     "ts": ev.event_time,
                 })
             elif kind == "model_response_error":
@@ -521,7 +600,7 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                     "type": "response",
                     "text": f"⚠ API error: {err_text}",
                     "puzzle_id": puzzle_id,
-                    "tokens": summarize_tokens_and_cost(ev.postings),
+                    "tokens": ev.tokens,
                     "ts": ev.event_time,
                     "is_error": True,
                 })
@@ -538,14 +617,14 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                     reason = "SOLVED" if str(to).upper() == "DONE" else ("FAILED" if str(to).upper() == "ERROR" else str(to).upper())
                     final_eval = last_eval_by_puzzle.get(str(puzzle_label)) or {}
                     summary: Dict[str, Any] = {}
-                    ps = puzzle_stats.get(str(puzzle_label))
+                    start_dt = puzzle_started.get(str(puzzle_label))
+                    ps = puzzle_stats.get(str(puzzle_label)) if start_dt is not None else None
                     if ps:
                         prompt_total = int(ps.get("prompt", 0))
                         completion_total = int(ps.get("completion", 0))
                         guesses_total = int(ps.get("guesses", 0))
                         correct_total = int(ps.get("correct", 0))
                         cost_total = float(ps.get("cost", 0.0))
-                        start_dt = ps.get("start_dt")
                         end_dt = ev.dt
                         if start_dt and end_dt:
                             seconds = int((end_dt - start_dt).total_seconds())
@@ -578,10 +657,10 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
         if not has_terminal_state_move and last_error_event is not None:
             ev = last_error_event
             pid = str(puzzle_id)
-            ps = puzzle_stats.get(pid)
+            start_dt = puzzle_started.get(pid)
+            ps = puzzle_stats.get(pid) if start_dt is not None else None
             summary = {}
             if ps:
-                start_dt = ps.get("start_dt")
                 end_dt = ev.dt
                 if start_dt and end_dt:
                     seconds = int((end_dt - start_dt).total_seconds())
@@ -610,7 +689,7 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
     parts: List[str] = []
     parts.append("<html><head><meta charset=\"utf-8\"><meta name=\"viewport\" content=\"width=device-width,initial-scale=1\">")
     parts.append(f"<title>Run {escape_html(run_id)} · Logs</title>")
-    parts.append(f"<style>{css}</style></head><body>")
+    parts.append(f"<style>{RUN_PAGE_CSS}</style></head><body>")
     parts.append("<div class=\"container\">")
     parts.append("<div class=\"panel\">")
     parts.append("<div class=\"topbar\">")
@@ -727,7 +806,7 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
             f"<summary class=\"puzzle-summary\">"
             f"<span class=\"pill\">Puzzle {escape_html(puzzle_pid)}</span>"
             f"<span class=\"puzzle-stats-inline\">"
-            f"{escape_html(stats_inline)}"
+            f"{stats_inline}"
             f"</span>"
             f"</summary>"
         )
@@ -750,7 +829,7 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                     if res:
                         details_bits.append(f"Result: {escape_html(str(res))}")
                     if gi is not None:
-                        details_bits.append(f"Guess #: {escape_html(str(gi))}")
+                        details_bits.append(f"Guess #: {gi}")
                     if rtxt:
                         th, rr = split_thinking_blocks(rtxt)
                         inner = []
@@ -779,11 +858,13 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
             if st == "prompt":
                 t = escape_html(step.get("text", ""))
                 tok = step.get("tokens", {})
-                parts.append("<div class=\"row\">")
-                parts.append("<div class=\"bubble left\">")
-                parts.append(f"<div class=\"metahead\"><span>PROMPT</span><span>{escape_html(step.get('ts',''))}</span></div>")
-                parts.append(f"<div class=\"body\">{t}</div>")
-                parts.append("</div>")
+                # One fragment per bubble rather than one per tag
+                parts.append(
+                    "<div class=\"row\"><div class=\"bubble left\">"
+                    f"<div class=\"metahead\"><span>PROMPT</span><span>{step.get('ts','')}</span></div>"
+                    f"<div class=\"body\">{t}</div>"
+                    "</div>"
+                )
                 stats = []
                 if tok.get("prompt_tokens"):
                     stats.append(f"prompt: {tok['prompt_tokens']:,}")
@@ -799,7 +880,6 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                 raw_text = step.get("text", "")
                 thinking, rest = split_thinking_blocks(raw_text)
                 tok = step.get("tokens", {})
-                parts.append("<div class=\"row\">")
                 bubble_inner: List[str] = []
                 if thinking:
                     bubble_inner.append(
@@ -810,19 +890,21 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
                 else:
                     bubble_inner.append(f"<div>{simple_markdown_to_html(raw_text)}</div>")
                 bubble_class = "bubble right error" if step.get("is_error") else "bubble right"
-                parts.append(f"<div class=\"{bubble_class}\">")
                 gh = []
                 if step.get("guess_index") is not None:
-                    gh.append(f"Guess {escape_html(str(step['guess_index']))}")
+                    gh.append(f"Guess {step['guess_index']}")
                 if step.get("result"):
                     gh.append(escape_html(str(step.get("result"))))
                 if step.get("is_error"):
                     meta_right = "API ERROR"
                 else:
                     meta_right = " · ".join(gh) if gh else "RESPONSE"
-                parts.append(f"<div class=\"metahead\"><span>{meta_right}</span><span>{escape_html(step.get('ts',''))}</span></div>")
-                parts.append(f"<div class=\"body\">{''.join(bubble_inner)}</div>")
-                parts.append("</div>")
+                parts.append(
+                    f"<div class=\"row\"><div class=\"{bubble_class}\">"
+                    f"<div class=\"metahead\"><span>{meta_right}</span><span>{step.get('ts','')}</span></div>"
+                    f"<div class=\"body\">{''.join(bubble_inner)}</div>"
+                    "</div>"
+                )
                 stats = []
                 if tok.get("prompt_tokens"):
                     stats.append(f"prompt: {tok['prompt_tokens']:,}")
@@ -841,36 +923,48 @@ def render_run_html(run_id: str, events: List[Event]) -> str:
 
     parts.append("<div class=\"footer\">Generated by generate_logs_view.py</div>")
     parts.append("</div></div></div></body></html>")
-    return "".join(parts)
+    return parts
 
 
-def write_run_page(run_id: str, html: str) -> Path:
+def write_run_page(run_id: str, parts: List[str]) -> Path:
     DOCS_LOG_DIR.mkdir(parents=True, exist_ok=True)
     out = DOCS_LOG_DIR / f"{run_id}.html"
-    out.write_text(html, encoding="utf-8")
+    # Encode once and hand the OS a single buffer; this beats both a text-mode
+    # writelines() and per-fragment os.writev() for pages of this size.
+    out.write_bytes("".join(parts).encode("utf-8"))
     return out
 
 
-def build_logs_index(pages: List[Tuple[str, Path]]) -> None:
-    # Industrial 1980s-themed index
-    css = (
-        "body{font-family:ui-monospace,Menlo,Consolas,Monaco,\\\"Courier New\\\",monospace;margin:0;padding:0;"
-        "background:repeating-linear-gradient(0deg,#e9ecef,#e9ecef 24px,#eff2f5 25px);color:#0f1419;}"
-        ".container{max-width:1024px;margin:0 auto;padding:24px;}"
-        ".panel{background:#ffffff;border:2px solid #2b3035;box-shadow:inset 0 0 0 1px #d9dde1;}"
-        ".topbar{display:flex;justify-content:space-between;align-items:center;padding:10px 14px;background:#1f2a36;color:#e6eef7;"
-        "border-bottom:2px solid #2b3035;letter-spacing:0.04em;text-transform:uppercase;}"
-        ".title{font-weight:700;} .meta{color:#8aa0b8;font-size:12px;}"
-        ".content{padding:16px;}"
-        ".table{width:100%;border-collapse:separate;border-spacing:0;}"
-        ".thead th{background:#f2f5f8;border:2px solid #2b3035;border-bottom:none;padding:8px 10px;text-align:left;font-size:12px;letter-spacing:.04em;text-transform:uppercase;}"
-        ".row{display:grid;grid-template-columns: 48% 32% 20%;align-items:center;}"
-        ".tr{border:2px solid #2b3035;border-top:none;background:#fff;}"
-        ".td{padding:10px 12px;border-right:2px solid #2b3035;} .td:last-child{border-right:none;}"
-        ".link a{color:#0b63ce;text-decoration:none;} .link a:hover{text-decoration:underline;}"
-        ".footer{margin:16px 0 0 0;color:#48525c;font-size:12px;}"
-    )
+def render_and_write_run_page(job: Tuple[Any, ...]) -> Tuple[str, Path]:
+    """Worker entry point: render one run and write its page.
+
+    job is render_run_html's arguments as a tuple.
+    """
+    run_id = job[0]
+    return run_id, write_run_page(run_id, render_run_html(*job))
+
+
+# Industrial 1980s-themed index
+INDEX_PAGE_CSS = (
+    "body{font-family:ui-monospace,Menlo,Consolas,Monaco,\\\"Courier New\\\",monospace;margin:0;padding:0;"
+    "background:repeating-linear-gradient(0deg,#e9ecef,#e9ecef 24px,#eff2f5 25px);color:#0f1419;}"
+    ".container{max-width:1024px;margin:0 auto;padding:24px;}"
+    ".panel{background:#ffffff;border:2px solid #2b3035;box-shadow:inset 0 0 0 1px #d9dde1;}"
+    ".topbar{display:flex;justify-content:space-between;align-items:center;padding:10px 14px;background:#1f2a36;color:#e6eef7;"
+    "border-bottom:2px solid #2b3035;letter-spacing:0.04em;text-transform:uppercase;}"
+    ".title{font-weight:700;} .meta{color:#8aa0b8;font-size:12px;}"
+    ".content{padding:16px;}"
+    ".table{width:100%;border-collapse:separate;border-spacing:0;}"
+    ".thead th{background:#f2f5f8;border:2px solid #2b3035;border-bottom:none;padding:8px 10px;text-align:left;font-size:12px;letter-spacing:.04em;text-transform:uppercase;}"
+    ".row{display:grid;grid-template-columns: 48% 32% 20%;align-items:center;}"
+    ".tr{border:2px solid #2b3035;border-top:none;background:#fff;}"
+    ".td{padding:10px 12px;border-right:2px solid #2b3035;} .td:last-child{border-right:none;}"
+    ".link a{color:#0b63ce;text-decoration:none;} .link a:hover{text-decoration:underline;}"
+    ".footer{margin:16px 0 0 0;color:#48525c;font-size:12px;}"
+)
 
+
+def build_logs_index(pages: List[Tuple[str, Path]]) -> None:
     # Prepare rows (derive timestamp/model from run_id if possible)
     def split_run(run_id: str) -> Tuple[str, str]:
         if "_" in run_id:
@@ -896,7 +990,7 @@ def build_logs_index(pages: List[Tuple[str, Path]]) -> None:
 
     html = (
         "<html><head><meta charset=\"utf-8\"><meta name=\"viewport\" content=\"width=device-width,initial-scale=1\">"
-        "<title>Logs</title>" f"<style>{css}</style></head><body>"
+        "<title>Logs</title>" f"<style>{INDEX_PAGE_CSS}</style></head><body>"
         "<div class=\"container\"><div class=\"panel\">"
         "<div class=\"topbar\"><div class=\"title\">Logs</div>"
         "<div class=\"meta\"><a href=\"../index.html\" style=\"color:#b6c7da\">Back</a></div></div>"
@@ -914,74 +1008,99 @@ def build_logs_index(pages: List[Tuple[str, Path]]) -> None:
     (DOCS_LOG_DIR / "index.html").write_text(html, encoding="utf-8")
 
 
+@lru_cache(maxsize=4096)
+def parse_start_timestamp(ts: str) -> datetime:
+    """Parse a run_summaries.csv start_timestamp as an aware UTC datetime.
+
+    Cached: rows from the same batch share timestamps. Unparseable values
+    sort first.
+    """
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except Exception:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    # MotherDuck emits some timestamps tz-naive; normalize to UTC so
+    # comparisons don't mix offset-aware and offset-naive datetimes.
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def select_latest_run_ids(csv_path: Path) -> List[str]:
+    """Latest run_id per (model, mode) in run_summaries.csv, by start_timestamp.
+
+    The one-shot and classic leaderboards each link their own latest run per
+    model. Rows are reduced as they are read, so only the current best is kept.
+    """
+    import csv
+    best_by_key: Dict[str, Tuple[str, datetime]] = {}
+    with csv_path.open("r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for r in reader:
+            # Rows without a run_id have no page to link; drop them before
+            # they can shadow an older, linkable run of the same model.
+            run_id = r.get("run_id")
+            if not run_id:
+                continue
+            try:
+                # Filters matching create_results_table_gt.py
+                if int(r.get("puzzles_attempted", "0") or 0) < 11:
+                    continue
+                # One-shot runs have exactly one guess per puzzle (<= 20 on the
+                # canonical set), so the classic >40 guess floor would exclude
+                # every one of them. Only apply it to classic runs.
+                run_mode = (r.get("mode") or "classic").strip() or "classic"
+                if run_mode != "oneshot" and int(r.get("total_guesses", "0") or 0) <= 40:
+                    continue
+                if r.get("total_cost", "") in ("", None):
+                    continue
+            except Exception:
+                continue
+            key = f"{r.get('model', '')}|{run_mode}"
+            dt = parse_start_timestamp(r.get("start_timestamp", ""))
+            existing = best_by_key.get(key)
+            if existing is None or dt > existing[1]:
+                best_by_key[key] = (run_id, dt)
+    return [run_id for run_id, _ in best_by_key.values()]
+
+
 def main():
-    print("🧭 Loading controllog events and postings…")
-    
     # Get MotherDuck database connection string from environment
     db = os.environ.get("MOTHERDUCK_DB", "md:")
-    
-    events_by_id = load_events_and_postings(db)
-    print(f"  Loaded {len(events_by_id)} events")
-
-    print("📚 Grouping by run…")
-    runs = group_by_run(events_by_id)
-    print(f"  Found {len(runs)} runs")
 
-    # Restrict to the same dataset as the results table, latest per model
+    # Restrict to the same dataset as the results table, latest per model.
+    # This is decided before loading so only those runs are queried.
     allowed_run_ids: List[str] = []
     if RUN_SUMMARIES_CSV.exists():
-        import csv
-        rows: List[Dict[str, Any]] = []
-        with RUN_SUMMARIES_CSV.open("r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for r in reader:
-                try:
-                    # Filters matching create_results_table_gt.py
-                    if int(r.get("puzzles_attempted", "0") or 0) < 11:
-                        continue
-                    # One-shot runs have exactly one guess per puzzle (<= 20 on the
-                    # canonical set), so the classic >40 guess floor would exclude
-                    # every one of them. Only apply it to classic runs.
-                    run_mode = (r.get("mode") or "classic").strip() or "classic"
-                    if run_mode != "oneshot" and int(r.get("total_guesses", "0") or 0) <= 40:
-                        continue
-                    if r.get("total_cost", "") in ("", None):
-                        continue
-                    rows.append(r)
-                except Exception:
-                    continue
-        # Select latest per (model, mode) by start_timestamp — the one-shot and
-        # classic leaderboards each link their own latest run per model.
-        best_by_key: Dict[str, Dict[str, Any]] = {}
-        for r in rows:
-            model = f"{r.get('model', '')}|{(r.get('mode') or 'classic').strip() or 'classic'}"
-            ts = r.get("start_timestamp", "")
-            try:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                # MotherDuck emits some timestamps tz-naive; normalize to UTC so
-                # comparisons don't mix offset-aware and offset-naive datetimes.
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-            except Exception:
-                dt = datetime.min.replace(tzinfo=timezone.utc)
-            existing = best_by_key.get(model)
-            if existing is None or dt > existing["dt"]:
-                best_by_key[model] = {"row": r, "dt": dt}
-        allowed_run_ids = [val["row"].get("run_id") for val in best_by_key.values() if val["row"].get("run_id")]
+        allowed_run_ids = select_latest_run_ids(RUN_SUMMARIES_CSV)
         print(f"  Filtered to {len(allowed_run_ids)} latest runs per model")
 
     # Generate only for allowed runs; if none, do not emit per-run pages
+    target_runs: Dict[str, List[Event]] = {}
+    puzzle_stats_by_run: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    model_by_run: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
     if allowed_run_ids:
-        target_runs = {rid: evs for rid, evs in runs.items() if rid in set(allowed_run_ids)}
-    else:
-        target_runs = {}
-
+        print("🧭 Loading controllog events and postings…")
+        try:
+            target_runs, puzzle_stats_by_run, model_by_run = load_events_and_postings(db, allowed_run_ids)
+        finally:
+            # Close the session before the render workers are forked; a live
+            # DuckDB handle and its threads must not be copied into a child.
+            get_connection(db).close()
+            get_connection.cache_clear()
+        print(f"  Found {len(target_runs)} runs")
+
+    # Runs are independent and rendering is CPU-bound, so pages are built in
+    # worker processes; map() keeps the results in run_id order.
+    jobs = [
+        (run_id, target_runs[run_id], puzzle_stats_by_run.get(run_id, {}), *model_by_run.get(run_id, (None, None)))
+        for run_id in sorted(target_runs)
+    ]
     pages: List[Tuple[str, Path]] = []
-    for run_id, evs in sorted(target_runs.items()):
-        html = render_run_html(run_id, evs)
-        out = write_run_page(run_id, html)
-        pages.append((run_id, out))
-        print(f"  Wrote {out}")
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+            pages = list(pool.map(render_and_write_run_page, jobs))
+        print(f"  Wrote {len(pages)} run pages to {DOCS_LOG_DIR}")
 
     build_logs_index(pages)
     print(f"✅ Logs index written to {DOCS_LOG_DIR / 'index.html'}")
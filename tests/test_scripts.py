@@ -0,0 +1,581 @@
+"""Tests for the reporting scripts in scripts/.
+
+Each test builds a small local CSV or DuckDB fixture and checks the script's
+output against what the original row-by-row Python implementation produced.
+"""
+
+import csv
+import importlib
+import math
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+
+
+def _import_script(name, *requires):
+    """Import scripts/<name>.py, skipping when a dependency is missing."""
+    for module in requires:
+        pytest.importorskip(module)
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
+
+
+def _controllog_db(path, events, postings):
+    """Create controllog.events/postings in a local DuckDB file.
+
+    events: (event_id, event_time, kind, run_id, puzzle_id, result, model)
+    postings: (posting_id, event_id, account_type, account_id, unit, delta, phase
+               [, to_state, time_kind])
+    """
+    import duckdb  # type: ignore
+
+    con = duckdb.connect(str(path))
+    con.execute("CREATE SCHEMA controllog")
+    con.execute("""
+        CREATE TABLE controllog.events (
+            event_id VARCHAR, event_time VARCHAR, kind VARCHAR,
+            actor_task_id VARCHAR, run_id VARCHAR,
+            payload_json STRUCT(puzzle_id BIGINT, result VARCHAR, model VARCHAR,
+                                provider VARCHAR, guess_index BIGINT,
+                                request_text VARCHAR, response_text VARCHAR)
+        )
+    """)
+    con.execute("""
+        CREATE TABLE controllog.postings (
+            posting_id VARCHAR, event_id VARCHAR, account_type VARCHAR,
+            account_id VARCHAR, unit VARCHAR, delta_numeric DOUBLE,
+            dims_json STRUCT(phase VARCHAR, "to" VARCHAR, kind VARCHAR)
+        )
+    """)
+    for event_id, event_time, kind, run_id, puzzle_id, result, model in events:
+        con.execute(
+            """
+            INSERT INTO controllog.events VALUES (
+                ?, ?, ?, NULL, ?,
+                {'puzzle_id': ?::BIGINT, 'result': ?::VARCHAR, 'model': ?::VARCHAR,
+                 'provider': NULL::VARCHAR, 'guess_index': NULL::BIGINT,
+                 'request_text': NULL::VARCHAR, 'response_text': NULL::VARCHAR}
+            )
+            """,
+            [event_id, event_time, kind, run_id, puzzle_id, result, model],
+        )
+    for posting in postings:
+        con.execute(
+            """
+            INSERT INTO controllog.postings VALUES (
+                ?, ?, ?, ?, ?, ?,
+                {'phase': ?::VARCHAR, 'to': ?::VARCHAR, 'kind': ?::VARCHAR}
+            )
+            """,
+            list(posting) + [None] * (9 - len(posting)),
+        )
+    con.close()
+    return str(path)
+
+
+def _baseline_puzzle_correct(result):
+    """Correct groups for one verdict, as the original Python loop counted them."""
+    res_u = str(result).upper()
+    if res_u.startswith("ONESHOT_SCORE_"):
+        m = re.search(r"GROUPS_(\d+)", res_u)
+        try:
+            if m:
+                return int(m.group(1))
+            return min(int(res_u.split("ONESHOT_SCORE_")[1].split("_")[0]), 4)
+        except (ValueError, IndexError):
+            return 0
+    if "CORRECT" in res_u and "INCORRECT" not in res_u:
+        return 1
+    return 0
+
+
+def _baseline_puzzle_guess(result):
+    res = str(result)
+    return int(bool(res) and "INVALID_RESPONSE" not in res.upper())
+
+
+class TestPuzzleStatsQuery:
+    """PUZZLE_STATS_QUERY matches the per-event Python rollup it replaced."""
+
+    VERDICTS = [
+        "ONESHOT_SCORE_5_GROUPS_3_TRAP_1",  # trap-scoring format: GROUPS_n
+        "ONESHOT_SCORE_2",                  # legacy: min(n, 4)
+        "ONESHOT_SCORE_9",                  # legacy, capped at 4
+        "ONESHOT_SCORE_X",                  # unparseable: 0
+        "ONESHOT_SCORE_",                   # unparseable: 0
+        "INVALID_RESPONSE",                 # not a graded attempt
+    ]
+
+    @classmethod
+    def _db(cls, tmp_path):
+        events = [("p1", "2025-01-01T00:00:00", "model_prompt", "run-a", 1, None, "m")]
+        postings = [
+            ("tok-1", "p1", "resource.tokens", "project:x", "+tokens", 100, "prompt"),
+            ("tok-1", "p1", "resource.tokens", "project:x", "+tokens", 100, "prompt"),  # repeated row
+            ("usd-1", "p1", "resource.money", "vendor:openrouter", "$", -0.25, None),
+        ]
+        for i, verdict in enumerate(cls.VERDICTS):
+            events.append((f"r{i}", f"2025-01-01T00:01:0{i}", "model_response", "run-a", 1, verdict, "m"))
+        # A repeated event row must not be counted twice.
+        events.append(("r0", "2025-01-01T00:01:00", "model_response", "run-a", 1, cls.VERDICTS[0], "m"))
+        events += [
+            ("c1", "2025-01-01T00:02:00", "model_completion", "run-a", 2, "CORRECT", "m"),
+            ("c2", "2025-01-01T00:02:01", "model_completion", "run-a", 2, "INCORRECT", "m"),
+            # Other runs are filtered out by the query.
+            ("o1", "2025-01-01T00:02:00", "model_completion", "run-b", 1, "CORRECT", "m"),
+        ]
+        return _controllog_db(tmp_path / "controllog.duckdb", events, postings)
+
+    def test_matches_baseline_rollup(self, tmp_path):
+        logs_view = _import_script("generate_logs_view", "duckdb")
+        con = logs_view.duckdb.connect(self._db(tmp_path))
+        try:
+            rows = con.execute(logs_view.PUZZLE_STATS_QUERY, [["run-a"], ["run-a"]]).fetchall()
+        finally:
+            con.close()
+
+        stats = {(run_id, puzzle_id): rest for run_id, puzzle_id, *rest in rows}
+        assert set(stats) == {("run-a", "1"), ("run-a", "2")}
+
+        prompt, completion, cost, guesses, correct = stats[("run-a", "1")]
+        assert (prompt, completion, cost) == (100, 0, pytest.approx(0.25))
+        assert guesses == sum(_baseline_puzzle_guess(v) for v in self.VERDICTS)
+        assert correct == sum(_baseline_puzzle_correct(v) for v in self.VERDICTS)
+        assert correct == 3 + 2 + 4
+
+        assert stats[("run-a", "2")][3:] == [2, 1]
+
+
+def _baseline_html_overrides(mviz, html):
+    """render_html's original post-processing: str.replace then re.sub."""
+    html = html.replace("</style>", mviz.OVERRIDE_CSS + "</style>", 1)
+    return re.sub(
+        r"\[([^\[\]]+)\]\((classic\.html|index\.html)\)",
+        r'<a href="\2">\1</a>',
+        html,
+    )
+
+
+class TestApplyHtmlOverrides:
+    """The one-pass splice in render_html matches the original replace + re.sub."""
+
+    def test_matches_baseline(self):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        html = (
+            "<style>body {}</style><p>Intro · [Classic (multi-turn) leaderboard →](classic.html)</p>"
+            "<p>[← One-shot leaderboard](index.html) and again "
+            "[Classic (multi-turn) leaderboard →](classic.html)</p>"
+            '<script>{"model": "[x](other.html)"}</script>'
+        )
+        out = mviz.apply_html_overrides(html)
+        assert out == _baseline_html_overrides(mviz, html)
+        assert out.count('<a href="classic.html">') == 2
+        assert "[x](other.html)" in out
+
+    def test_without_style_block(self):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        html = "<p>[← One-shot leaderboard](index.html)</p>"
+        assert mviz.apply_html_overrides(html) == _baseline_html_overrides(mviz, html)
+
+
+class TestLoadEventsAndPostings:
+    """The loader's SQL rollups attach the same totals the Python passes did."""
+
+    def test_loads_deduped_runs_with_tokens_and_models(self, tmp_path):
+        logs_view = _import_script("generate_logs_view", "duckdb")
+        db = TestPuzzleStatsQuery._db(tmp_path)
+        try:
+            runs, puzzle_stats, model_by_run = logs_view.load_events_and_postings(db, ["run-a"])
+        finally:
+            logs_view.get_connection(db).close()
+            logs_view.get_connection.cache_clear()
+
+        assert set(runs) == {"run-a"}
+        events = runs["run-a"]
+        ids = [ev.event_id for ev in events]
+        # One Event per event_id, in time order.
+        assert len(ids) == len(set(ids)) == 1 + len(TestPuzzleStatsQuery.VERDICTS) + 2
+        assert [ev.dt for ev in events] == sorted(ev.dt for ev in events)
+
+        # summarize_tokens_and_cost() on the prompt's postings: the repeated
+        # posting row is counted once.
+        by_id = {ev.event_id: ev for ev in events}
+        assert by_id["p1"].tokens == {"prompt_tokens": 100, "completion_tokens": 0, "cost": pytest.approx(0.25)}
+        assert by_id["c1"].tokens == {"prompt_tokens": 0, "completion_tokens": 0, "cost": None}
+
+        assert model_by_run == {"run-a": ("m", None)}
+        assert puzzle_stats["run-a"]["2"] == {
+            "prompt": 0, "completion": 0, "cost": 0.0, "guesses": 2, "correct": 1,
+        }
+
+
+def _baseline_latest_run_ids(csv_path):
+    """generate_logs_view.main()'s original latest-run selection."""
+    from datetime import datetime, timezone
+
+    rows = []
+    with open(csv_path, encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            try:
+                if int(r.get("puzzles_attempted", "0") or 0) < 11:
+                    continue
+                run_mode = (r.get("mode") or "classic").strip() or "classic"
+                if run_mode != "oneshot" and int(r.get("total_guesses", "0") or 0) <= 40:
+                    continue
+                if r.get("total_cost", "") in ("", None):
+                    continue
+                rows.append(r)
+            except Exception:
+                continue
+    best_by_key = {}
+    for r in rows:
+        model = f"{r.get('model', '')}|{(r.get('mode') or 'classic').strip() or 'classic'}"
+        ts = r.get("start_timestamp", "")
+        try:
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+        except Exception:
+            dt = datetime.min.replace(tzinfo=timezone.utc)
+        existing = best_by_key.get(model)
+        if existing is None or dt > existing["dt"]:
+            best_by_key[model] = {"row": r, "dt": dt}
+    return [v["row"].get("run_id") for v in best_by_key.values() if v["row"].get("run_id")]
+
+
+def _write_csv(path, rows):
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+class TestSelectLatestRunIds:
+    """select_latest_run_ids picks the same runs as the original two-pass loop."""
+
+    @staticmethod
+    def _row(run_id, model, ts, mode="classic", attempted=20, guesses=60, cost="1.0"):
+        return {
+            "run_id": run_id, "model": model, "mode": mode, "start_timestamp": ts,
+            "puzzles_attempted": attempted, "total_guesses": guesses, "total_cost": cost,
+        }
+
+    def test_matches_baseline(self, tmp_path):
+        logs_view = _import_script("generate_logs_view", "duckdb")
+        rows = [
+            self._row("a-old", "a", "2025-01-01T00:00:00"),
+            self._row("a-new", "a", "2025-02-01T00:00:00+00:00"),
+            # Same model, other mode: linked separately. One guess per puzzle.
+            self._row("a-oneshot", "a", "2025-01-15T00:00:00", mode="oneshot", guesses=20),
+            self._row("b-few-guesses", "b", "2025-02-01T00:00:00", guesses=40),
+            self._row("c-short", "c", "2025-02-01T00:00:00", attempted=10),
+            self._row("d-no-cost", "d", "2025-02-01T00:00:00", cost=""),
+            # Z suffix and tz-naive timestamps compare as UTC.
+            self._row("e-z", "e", "2025-03-01T00:00:00Z"),
+            self._row("e-naive", "e", "2025-02-28T23:00:00"),
+            # Unparseable timestamps sort first.
+            self._row("f-bad", "f", "garbage"),
+            self._row("f-ok", "f", "2024-01-01T00:00:00"),
+            self._row("g-empty-mode", "g", "2025-01-01T00:00:00", mode=""),
+        ]
+        csv_path = _write_csv(tmp_path / "run_summaries.csv", rows)
+
+        selected = logs_view.select_latest_run_ids(csv_path)
+        assert sorted(selected) == sorted(_baseline_latest_run_ids(csv_path))
+        assert sorted(selected) == ["a-new", "a-oneshot", "e-z", "f-ok", "g-empty-mode"]
+
+    def test_row_without_run_id_does_not_shadow_older_run(self, tmp_path):
+        # Deliberate change from the original loop, which let a newer row with
+        # no run_id hide the older linkable run of the same model.
+        logs_view = _import_script("generate_logs_view", "duckdb")
+        rows = [
+            self._row("a-old", "a", "2025-01-01T00:00:00"),
+            self._row("", "a", "2025-02-01T00:00:00"),
+        ]
+        csv_path = _write_csv(tmp_path / "run_summaries.csv", rows)
+        assert logs_view.select_latest_run_ids(csv_path) == ["a-old"]
+
+
+class TestExtractRunSummaries:
+    """The single SQL rollup reproduces the original query plus Python metrics."""
+
+    def _db(self, tmp_path):
+        alpha = "2025-01-01T00-00-00_alpha"
+        beta = "2025-01-02T00-00-00_beta"
+        gamma = "2025-01-03T00-00-00_gamma"
+        events = [
+            # Classic run: p1 solved (CORRECT, INCORRECT), p2 failed (INVALID).
+            ("a1", "2025-01-01T00:00:00", "model_prompt", alpha, 1, None, "prov/alpha"),
+            ("a2", "2025-01-01T00:00:01", "model_completion", alpha, 1, "CORRECT", "prov/alpha"),
+            ("a3", "2025-01-01T00:00:02", "model_completion", alpha, 1, "INCORRECT", "prov/alpha"),
+            ("a4", "2025-01-01T00:00:03", "model_completion", alpha, 2, "INVALID_RESPONSE", "prov/alpha"),
+            ("a5", "2025-01-01T00:00:04", "state_move", alpha, 1, None, None),
+            ("a6", "2025-01-01T00:00:05", "state_move", alpha, 2, None, None),
+            # One-shot run: trap-scored, invalid, and partial submissions.
+            ("b1", "2025-01-02T00:00:00", "model_prompt", beta, 1, None, "prov/beta"),
+            ("b2", "2025-01-02T00:00:01", "model_completion", beta, 1, "ONESHOT_SCORE_5_GROUPS_4_TRAP_2_MAX_5", "prov/beta"),
+            ("b3", "2025-01-02T00:00:02", "model_completion", beta, 2, "ONESHOT_INVALID_MAX_5", "prov/beta"),
+            ("b4", "2025-01-02T00:00:03", "model_completion", beta, 3, "ONESHOT_SCORE_1_GROUPS_2_TRAP_0_MAX_5", "prov/beta"),
+            # All-API-error run: no model on any prompt/completion event.
+            ("g1", "2025-01-03T00:00:00", "model_response_error", gamma, 1, "ONESHOT_API_ERROR_MAX_5", None),
+            # Excluded by name.
+            ("s1", "2025-01-04T00:00:00", "model_completion", "2025-01-04_sherlock", 1, "CORRECT", "x"),
+        ]
+        postings = [
+            # Tokens: provider: is counted, its project: mirror is not.
+            ("t1", "a1", "resource.tokens", "provider:openrouter", "+tokens", -100, "prompt"),
+            ("t2", "a1", "resource.tokens", "project:connections_eval", "+tokens", 100, "prompt"),
+            ("t3", "a2", "resource.tokens", "provider:openrouter", "+tokens", -40, "completion"),
+            ("t4", "a2", "resource.tokens", "project:connections_eval", "+tokens", 40, "completion"),
+            ("m1", "a2", "resource.money", "vendor:openrouter", "$", -0.5, None),
+            ("m2", "a2", "resource.money", "project:connections_eval", "$", 0.5, None),
+            ("m3", "a2", "resource.money", "vendor:upstream", "$", -0.25, None),
+            ("m4", "a2", "resource.money", "project:connections_eval", "$", 0.25, None),
+            # Time: project: is counted, agent: is its mirror. Missing kind = wall.
+            ("w1", "a2", "resource.time_ms", "project:connections_eval", "ms", 3000, None, None, "wall"),
+            ("w2", "a2", "resource.time_ms", "agent:alpha", "ms", -3000, None, None, "wall"),
+            ("w3", "a3", "resource.time_ms", "project:connections_eval", "ms", 1000, None, None, None),
+            ("w4", "a3", "resource.time_ms", "project:connections_eval", "ms", 500, None, None, "backoff"),
+            ("s1", "a5", "truth.state", "task:1", "state", 1, None, "DONE"),
+            ("s2", "a6", "truth.state", "task:2", "state", 1, None, "FAILED"),
+        ]
+        return alpha, beta, gamma, _controllog_db(tmp_path / "controllog.duckdb", events, postings)
+
+    def test_matches_baseline_summaries(self, tmp_path):
+        summaries = _import_script("extract_summaries", "duckdb")
+        alpha, beta, gamma, db = self._db(tmp_path)
+        con = summaries.duckdb.connect(db)
+        try:
+            assert summaries.extract_run_summaries_from_motherduck(con) == 3
+            select_list = ", ".join(f'"{col}"' for col in summaries.SUMMARY_COLUMNS)
+            rows = con.execute(f"SELECT {select_list} FROM run_summaries").fetchall()
+        finally:
+            con.close()
+        by_run = {row[1]: dict(zip(summaries.SUMMARY_COLUMNS, row)) for row in rows}
+        assert set(by_run) == {alpha, beta, gamma}
+
+        common = {"log_file": None, "seed": None, "token_count_method": "API"}
+        expected = {
+            alpha: {
+                **common, "model": "prov/alpha", "mode": "classic",
+                "timestamp": "2025-01-01T00:00:00",
+                "start_timestamp": "2025-01-01T00:00:00", "end_timestamp": "2025-01-01T00:00:05",
+                "puzzles_attempted": 2, "puzzles_solved": 1, "solve_rate": 0.5,
+                "total_guesses": 3, "correct_guesses": 1, "incorrect_guesses": 1,
+                "invalid_responses": 1, "guess_accuracy": 1 / 3,
+                "total_score": None, "total_trap_bonus": None, "max_score": None,
+                "avg_score": None, "trap_scored": None,
+                "total_time_sec": 4.0, "avg_time_sec": 2.0, "total_backoff_sec": 0.5,
+                "total_inference_sec": 3.5, "avg_inference_sec": 1.75,
+                "total_tokens": 140, "total_prompt_tokens": 100, "total_completion_tokens": 40,
+                "total_cost": 0.5, "total_upstream_cost": 0.25,
+            },
+            beta: {
+                **common, "model": "prov/beta", "mode": "oneshot",
+                "timestamp": "2025-01-02T00:00:00",
+                "start_timestamp": "2025-01-02T00:00:00", "end_timestamp": "2025-01-02T00:00:03",
+                "puzzles_attempted": 3, "puzzles_solved": 0, "solve_rate": 0.0,
+                "total_guesses": 3, "correct_guesses": 4 + 2, "incorrect_guesses": 0 + 2,
+                "invalid_responses": 1, "guess_accuracy": 2.0,
+                "total_score": 6, "total_trap_bonus": 2, "max_score": 15,
+                "avg_score": 2.0, "trap_scored": 1,
+                # No backoff postings: inference time is unknown, not zero.
+                "total_time_sec": 0.0, "avg_time_sec": 0.0, "total_backoff_sec": None,
+                "total_inference_sec": None, "avg_inference_sec": None,
+                "total_tokens": 0, "total_prompt_tokens": 0, "total_completion_tokens": 0,
+                "total_cost": 0.0, "total_upstream_cost": 0.0,
+            },
+            gamma: {
+                # No model on any prompt/completion event: 'unknown', which the
+                # leaderboard filters out.
+                **common, "model": "unknown", "mode": "oneshot",
+                "timestamp": "2025-01-03T00:00:00",
+                "start_timestamp": "2025-01-03T00:00:00", "end_timestamp": "2025-01-03T00:00:00",
+                "puzzles_attempted": 1, "puzzles_solved": 0, "solve_rate": 0.0,
+                "total_guesses": 0, "correct_guesses": 0, "incorrect_guesses": 0,
+                "invalid_responses": 0, "guess_accuracy": 0.0,
+                "total_score": 0, "total_trap_bonus": 0, "max_score": 5,
+                "avg_score": 0.0, "trap_scored": 1,
+                "total_time_sec": 0.0, "avg_time_sec": 0.0, "total_backoff_sec": None,
+                "total_inference_sec": None, "avg_inference_sec": None,
+                "total_tokens": 0, "total_prompt_tokens": 0, "total_completion_tokens": 0,
+                "total_cost": 0.0, "total_upstream_cost": 0.0,
+            },
+        }
+        for run_id, want in expected.items():
+            got = by_run[run_id]
+            for col, value in want.items():
+                if isinstance(value, float):
+                    assert got[col] == pytest.approx(value), (run_id, col)
+                else:
+                    assert got[col] == value, (run_id, col)
+
+
+def _leaderboard_row(run_id, model, ts, mode="oneshot", **overrides):
+    row = {
+        "run_id": run_id, "model": model, "mode": mode, "start_timestamp": ts,
+        "puzzles_attempted": 20, "puzzles_solved": 10, "solve_rate": 0.5,
+        "total_guesses": 80, "correct_guesses": 40, "invalid_responses": 1,
+        "guess_accuracy": 0.5, "total_score": 55, "total_trap_bonus": 4,
+        "max_score": 100, "trap_scored": 1, "avg_time_sec": 75.0,
+        "avg_inference_sec": 65.0, "total_tokens": 123456, "total_cost": 1.5,
+        "total_upstream_cost": 0.25,
+    }
+    row.update(overrides)
+    return row
+
+
+def _leaderboard_csv(tmp_path):
+    rows = [
+        _leaderboard_row("a-old", "a", "2025-01-01T00:00:00", total_score=90),
+        _leaderboard_row("a-new", "a", "2025-02-01T00:00:00+00:00", total_score=60),
+        # Missing inference time, trap bonus and max score.
+        _leaderboard_row("b", "b", "2025-01-10T00:00:00", total_score=60,
+                         avg_inference_sec="", total_trap_bonus="", max_score="",
+                         avg_time_sec=42.9, total_upstream_cost=""),
+        _leaderboard_row("c", "c", "2025-01-10T00:00:00", total_score=70, avg_time_sec=-3,
+                         avg_inference_sec=""),
+        _leaderboard_row("unknown", "unknown", "2025-01-10T00:00:00"),
+        _leaderboard_row("short", "d", "2025-01-10T00:00:00", puzzles_attempted=19),
+        _leaderboard_row("legacy", "e", "2025-01-10T00:00:00", trap_scored=0),
+        _leaderboard_row("no-cost", "f", "2025-01-10T00:00:00", total_cost=""),
+        _leaderboard_row("classic-a-old", "a", "2025-01-01T00:00:00", mode="classic",
+                         solve_rate=0.9, total_score="", trap_scored=""),
+        _leaderboard_row("classic-a-new", "a", "2025-03-01T00:00:00Z", mode="classic",
+                         solve_rate=0.4, total_score="", trap_scored=""),
+        _leaderboard_row("classic-b", "b", "2025-01-05T00:00:00", mode="classic",
+                         solve_rate=0.75, avg_time_sec=3725.0, avg_inference_sec="",
+                         total_score="", trap_scored=""),
+    ]
+    return _write_csv(tmp_path / "run_summaries.csv", rows)
+
+
+def _baseline_latest_runs(csv_file, mode):
+    """create_results_mviz.load_and_filter_data before it was vectorized."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_file)
+    df = df.assign(mode=df["mode"].fillna("classic"))
+    filtered = df[
+        (df["puzzles_attempted"] == 20)
+        & (df["total_cost"].notna())
+        & (df["mode"] == mode)
+        & (df["model"] != "unknown")
+    ].copy()
+    if mode == "oneshot":
+        filtered = filtered[filtered["trap_scored"].fillna(0) == 1]
+    filtered["eval_cost"] = filtered["total_cost"] + filtered["total_upstream_cost"].fillna(0)
+    filtered["start_timestamp"] = pd.to_datetime(filtered["start_timestamp"], format="ISO8601", utc=True)
+    latest = filtered.loc[filtered.groupby("model")["start_timestamp"].idxmax()].copy()
+    latest["eval_cost_per_game"] = latest["eval_cost"] / latest["puzzles_attempted"]
+    sort_time = latest["avg_inference_sec"].where(latest["avg_inference_sec"].notna(), latest["avg_time_sec"])
+    if mode == "oneshot":
+        latest["total_score"] = latest["total_score"].fillna(0)
+        sort_keys = ["total_score", "_sort_time", "eval_cost_per_game"]
+    else:
+        sort_keys = ["solve_rate", "_sort_time", "eval_cost_per_game"]
+    return latest.assign(_sort_time=sort_time).sort_values(
+        sort_keys, ascending=[False, True, True]
+    ).drop(columns=["_sort_time"])
+
+
+def _baseline_format_time(seconds):
+    if seconds is None or (isinstance(seconds, float) and math.isnan(seconds)):
+        return "0s"
+    seconds = max(float(seconds), 0)
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes}m{secs}s" if minutes > 0 else f"{secs}s"
+
+
+def _baseline_table_data(df, mode):
+    """create_results_mviz.build_table_data's original iterrows() loop."""
+    import pandas as pd
+
+    rows = []
+    for _, row in df.iterrows():
+        run_id = row.get("run_id", "")
+        model_cell = f'<a href="logs/{run_id}.html">{row["model"]}</a>' if run_id else row["model"]
+        avg_inference = row.get("avg_inference_sec")
+        avg_time = row["avg_time_sec"] if avg_inference is None or pd.isna(avg_inference) else avg_inference
+        tail = {
+            "avg_time": _baseline_format_time(avg_time),
+            "tok_per_game": f"{row['total_tokens'] / row['puzzles_attempted'] / 1000:.1f}k",
+            "cost": round(float(row["eval_cost"]), 2),
+            "cost_per_game": f"${row['eval_cost'] / row['puzzles_attempted']:.3f}",
+        }
+        date = row["start_timestamp"].strftime("%Y-%m-%d")
+        if mode == "oneshot":
+            max_score = row.get("max_score")
+            max_score = int(max_score) if not pd.isna(max_score) else 5 * int(row["puzzles_attempted"])
+            trap_bonus = row.get("total_trap_bonus")
+            rows.append({
+                "model": model_cell,
+                "date": date,
+                "pts": int(row["total_score"]),
+                "pts_pct": round(float(row["total_score"]) / max_score, 4) if max_score else 0.0,
+                "w": str(int(row["puzzles_solved"])),
+                "grp": f"{int(row['correct_guesses'])}/{4 * int(row['puzzles_attempted'])}",
+                "trap": "—" if pd.isna(trap_bonus) else str(int(trap_bonus)),
+                "inv": str(int(row["invalid_responses"])),
+                **tail,
+            })
+        else:
+            rows.append({
+                "model": model_cell,
+                "date": date,
+                "w": str(int(row["puzzles_solved"])),
+                "win_pct": round(float(row["solve_rate"]), 4),
+                "hit_att": f"{int(row['correct_guesses'])}/{int(row['total_guesses'])}",
+                "acc_pct": round(float(row["guess_accuracy"]), 4),
+                **tail,
+            })
+    return rows
+
+
+class TestLeaderboardData:
+    """Vectorized leaderboard loading and formatting match the row-wise originals."""
+
+    @pytest.mark.parametrize("mode", ["oneshot", "classic"])
+    def test_latest_runs_match_baseline(self, tmp_path, mode):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        csv_file = _leaderboard_csv(tmp_path)
+
+        got = mviz.load_and_filter_data(str(csv_file), mode=mode)
+        want = _baseline_latest_runs(csv_file, mode)
+
+        assert list(got["run_id"]) == list(want["run_id"])
+        assert list(got["eval_cost_per_game"]) == pytest.approx(list(want["eval_cost_per_game"]))
+
+    def test_latest_runs_pick_newest_per_model(self, tmp_path):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        csv_file = _leaderboard_csv(tmp_path)
+        assert list(mviz.load_and_filter_data(str(csv_file), mode="oneshot")["run_id"]) == ["c", "b", "a-new"]
+        assert list(mviz.load_and_filter_data(str(csv_file), mode="classic")["run_id"]) == [
+            "classic-b", "classic-a-new",
+        ]
+
+    @pytest.mark.parametrize("mode", ["oneshot", "classic"])
+    def test_table_data_matches_baseline(self, tmp_path, mode):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        df = mviz.load_and_filter_data(str(_leaderboard_csv(tmp_path)), mode=mode)
+        assert mviz.build_table_data(df, mode) == _baseline_table_data(df, mode)
+
+    def test_format_time_and_tokens_match_baseline(self):
+        mviz = _import_script("create_results_mviz", "pandas", "numpy")
+        import numpy as np
+        import pandas as pd
+
+        seconds = [float("nan"), -5.0, 0.0, 59.9, 60.0, 61.5, 3725.0]
+        assert list(mviz.format_time(pd.Series(seconds))) == [_baseline_format_time(s) for s in seconds]
+
+        tokens = np.array([0.0, 49.0, 1234.5, 6172.8, 1_000_000.0])
+        assert list(mviz.format_tokens(tokens)) == [f"{t / 1000:.1f}k" for t in tokens]